@@ -1,8 +1,8 @@
 """Configuration manager for the weather monitoring system."""
 
 import os
-import yaml
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
 from pathlib import Path
 
 
@@ -18,6 +18,7 @@ class ConfigManager:
         """
         self._config_path = config_path or self._find_config_file()
         self._config: Dict[str, Any] = {}
+        self._sections: Dict[str, Mapping[str, Any]] = {}
         self._load_config()
         
     def _find_config_file(self) -> str:
@@ -38,9 +39,13 @@ class ConfigManager:
     
     def _load_config(self) -> None:
         """Load configuration from YAML file and environment variables."""
+        # Imported here to keep startup fast; prefer the libyaml C loader when available
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        
         try:
             with open(self._config_path, 'r') as file:
-                self._config = yaml.safe_load(file) or {}
+                self._config = yaml.load(file, Loader=loader) or {}
         except Exception as e:
             raise RuntimeError(f"Failed to load configuration: {e}")
         
@@ -49,6 +54,12 @@ class ConfigManager:
         
         # Validate configuration
         self._validate_config()
+        
+        # Configuration is immutable after load, so hand out read-only views
+        self._sections = {
+            section: MappingProxyType(self._config[section])
+            for section in ('lora', 'influxdb', 'device', 'logging', 'storage')
+        }
     
     def _apply_env_overrides(self) -> None:
         """Apply environment variable overrides."""
@@ -108,25 +119,25 @@ class ConfigManager:
         except (KeyError, TypeError):
             return default
     
-    def get_influxdb_config(self) -> Dict[str, Any]:
-        """Get InfluxDB configuration."""
-        return self._config['influxdb'].copy()
+    def get_influxdb_config(self) -> Mapping[str, Any]:
+        """Get InfluxDB configuration as a read-only view."""
+        return self._sections['influxdb']
     
-    def get_lora_config(self) -> Dict[str, Any]:
-        """Get LoRa configuration."""
-        return self._config['lora'].copy()
+    def get_lora_config(self) -> Mapping[str, Any]:
+        """Get LoRa configuration as a read-only view."""
+        return self._sections['lora']
     
-    def get_device_config(self) -> Dict[str, Any]:
-        """Get device configuration."""
-        return self._config['device'].copy()
+    def get_device_config(self) -> Mapping[str, Any]:
+        """Get device configuration as a read-only view."""
+        return self._sections['device']
     
-    def get_logging_config(self) -> Dict[str, Any]:
-        """Get logging configuration."""
-        return self._config['logging'].copy()
+    def get_logging_config(self) -> Mapping[str, Any]:
+        """Get logging configuration as a read-only view."""
+        return self._sections['logging']
     
-    def get_storage_config(self) -> Dict[str, Any]:
-        """Get storage configuration."""
-        return self._config['storage'].copy()
+    def get_storage_config(self) -> Mapping[str, Any]:
+        """Get storage configuration as a read-only view."""
+        return self._sections['storage']
     
     def get_data_processing_config(self) -> Dict[str, Any]:
         """Get data processing configuration."""
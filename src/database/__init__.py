@@ -1,5 +1,6 @@
 """Database module for InfluxDB operations."""
 
-from .influxdb_client import InfluxDBManager
+from .influxdb_client import InfluxDBManager, InfluxDBRejectedError, InfluxDBRequestTooLargeError
+from .replay_log import ReplayLog
 
-__all__ = ["InfluxDBManager"]
\ No newline at end of file
+__all__ = ["InfluxDBManager", "InfluxDBRejectedError", "InfluxDBRequestTooLargeError", "ReplayLog"]
\ No newline at end of file
@@ -1,22 +1,60 @@
 """InfluxDB client for storing sensor data."""
 
-import time
+import math
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
-
-from influxdb_client import InfluxDBClient, Point, WritePrecision
-from influxdb_client.client.write_api import SYNCHRONOUS
-from influxdb_client.rest import ApiException
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple, Union
+from datetime import datetime, timezone
 
 from ..config.config_manager import ConfigManager
 
+# influxdb_client is imported on first use to keep startup fast
+if TYPE_CHECKING:
+    from influxdb_client import InfluxDBClient
+    from influxdb_client.client.write_api import WriteOptions
+
+
+MEASUREMENT = "sensor_data"
+
+# Line protocol escaping for tag values / field keys, as done by the InfluxDB client
+_ESCAPE_KEY = str.maketrans({
+    ',': r'\,', '=': r'\=', ' ': r'\ ', '\n': r'\n', '\t': r'\t', '\r': r'\r'
+})
+
+# String field values: quotes and backslashes are escaped; control characters,
+# which the client writes raw, are stored as visible escapes so that every
+# record stays on one line of the daily log
+_ESCAPE_STRING = str.maketrans({
+    '\\': '\\\\', '"': r'\"',
+    **{chr(c): f"\\x{c:02x}" for c in (*range(0x20), 0x7f)},
+    '\n': r'\n', '\t': r'\t', '\r': r'\r'
+})
+
+
+# Write responses caused by the records themselves: a parse error or field type
+# conflict (400), or timestamps outside the bucket's retention period (422)
+_REJECTED_STATUSES = frozenset({400, 422})
+
+# Write responses caused by the token, org or bucket; every record would fail
+_CONFIG_ERROR_STATUSES = frozenset({401, 403, 404})
+
+_TOO_LARGE_STATUS = 413
+
 
 class InfluxDBError(Exception):
     """Raised when InfluxDB operations fail."""
     pass
 
 
+class InfluxDBRejectedError(InfluxDBError):
+    """Raised when InfluxDB rejects records as invalid, so retrying cannot succeed."""
+    pass
+
+
+class InfluxDBRequestTooLargeError(InfluxDBError):
+    """Raised when InfluxDB refuses a write because the request body is too large."""
+    pass
+
+
 class InfluxDBManager:
     """Manages InfluxDB operations for sensor data storage."""
     
@@ -28,23 +66,43 @@ class InfluxDBManager:
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.client: Optional[InfluxDBClient] = None
+        self.client: Optional["InfluxDBClient"] = None
         self.write_api = None
+        self._write_precision = None
         self.retry_config = config.get_retry_config()
+        self._replay_write_api = None
+        
+        # Optional hooks called with the line protocol body of each batch
+        self.on_batch_written: Optional[Callable[[bytes], None]] = None
+        self.on_batch_failed: Optional[Callable[[bytes], None]] = None
+        
+        influxdb_config = config.get_influxdb_config()
+        self._bucket = influxdb_config['bucket']
+        self._org = influxdb_config['org']
+        self._device_id = config.get_device_config()['id']
+        self._lp_prefix = self._line_prefix(self._device_id)
         
         self._initialize_client()
     
     def _initialize_client(self) -> None:
-        """Initialize InfluxDB client with retry logic."""
+        """Initialize InfluxDB client and its batching write API."""
         influxdb_config = self.config.get_influxdb_config()
         
         try:
+            from influxdb_client import InfluxDBClient, WritePrecision
+            
+            self._write_precision = WritePrecision.S
             self.client = InfluxDBClient(
                 url=influxdb_config['url'],
                 token=influxdb_config['token'],
-                org=influxdb_config['org']
+                org=self._org
+            )
+            self.write_api = self.client.write_api(
+                write_options=self._build_write_options(influxdb_config),
+                success_callback=self._on_batch_success,
+                error_callback=self._on_batch_error,
+                retry_callback=self._on_batch_retry
             )
-            self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
             
             # Test connection
             health = self.client.health()
@@ -54,92 +112,222 @@ class InfluxDBManager:
                 raise InfluxDBError(f"InfluxDB health check failed: {health.message}")
                 
         except Exception as e:
-            self.logger.error(f"Failed to initialize InfluxDB client: {e}")
+            self.logger.error("Failed to initialize InfluxDB client: %s", e)
             raise InfluxDBError(f"InfluxDB initialization failed: {e}")
     
-    def write_sensor_data(self, timestamp: datetime, device_id: str, data: Dict[str, Any]) -> bool:
-        """Write sensor data to InfluxDB with retry logic.
+    def _build_write_options(self, influxdb_config: Dict[str, Any]) -> "WriteOptions":
+        """Build batching write options from InfluxDB and retry configuration.
+        
+        Args:
+            influxdb_config: InfluxDB configuration section
+            
+        Returns:
+            Write options for the background batching write API
+        """
+        from influxdb_client.client.write_api import WriteOptions
+        
+        max_attempts = self.retry_config.get('max_attempts', 3)
+        backoff_factor = self.retry_config.get('backoff_factor', 2)
+        initial_delay = self.retry_config.get('initial_delay', 1.0)
+        
+        return WriteOptions(
+            batch_size=influxdb_config.get('batch_size', 5000),
+            flush_interval=influxdb_config.get('flush_interval_ms', 10_000),
+            jitter_interval=influxdb_config.get('jitter_interval_ms', 2_000),
+            retry_interval=int(initial_delay * 1000),
+            max_retries=max(max_attempts - 1, 0),
+            exponential_base=backoff_factor
+        )
+    
+    def write_sensor_data(self, timestamp: Union[datetime, int], device_id: str,
+                          data: Dict[str, Any]) -> bool:
+        """Queue sensor data for a batched write to InfluxDB.
         
         Args:
-            timestamp: Data timestamp
+            timestamp: Data timestamp, or epoch nanoseconds as an int
             device_id: Device identifier
             data: Sensor data dictionary
             
         Returns:
-            True if write was successful, False otherwise
+            True if the point was queued successfully, False otherwise
+        """
+        line = self.build_line(timestamp, device_id, data)
+        if line is None:
+            self.logger.warning("No writable fields for %s, skipping InfluxDB write", device_id)
+            return False
+        
+        return self.write_line(line)
+    
+    def write_line(self, line: str) -> bool:
+        """Queue a line protocol record for a batched write to InfluxDB.
+        
+        The record is handed to the client's background batcher, which flushes
+        on batch size or flush interval and retries failed batches itself.
+        
+        Args:
+            line: Line protocol record with a timestamp in seconds
+            
+        Returns:
+            True if the record was queued successfully, False otherwise
         """
         if not self.write_api:
             self.logger.error("InfluxDB write API not initialized")
             return False
         
-        return self._write_with_retry(timestamp, device_id, data)
+        try:
+            self.write_api.write(
+                bucket=self._bucket,
+                org=self._org,
+                record=line,
+                write_precision=self._write_precision
+            )
+            
+            self.logger.debug("Queued record for InfluxDB write: %s", line)
+            return True
+            
+        except Exception as e:
+            self.logger.error("Failed to queue data for InfluxDB: %s", e)
+            return False
     
-    def _write_with_retry(self, timestamp: datetime, device_id: str, data: Dict[str, Any]) -> bool:
-        """Write data with exponential backoff retry logic.
+    def write_lines(self, lines: List[bytes]) -> bool:
+        """Synchronously write a chunk of line protocol records to InfluxDB.
+        
+        Used to replay records from disk; unlike write_line this waits for
+        InfluxDB to accept the request.
         
         Args:
-            timestamp: Data timestamp
-            device_id: Device identifier
-            data: Sensor data dictionary
+            lines: Line protocol records with timestamps in seconds
             
         Returns:
-            True if write was successful, False otherwise
+            True if InfluxDB accepted the records, False if the write failed
+            and may succeed when retried
+            
+        Raises:
+            InfluxDBRejectedError: If InfluxDB rejected the records as
+                invalid, e.g. a field type conflict
+            InfluxDBRequestTooLargeError: If the request body was too large
+                and the chunk should be split
         """
-        max_attempts = self.retry_config.get('max_attempts', 3)
-        backoff_factor = self.retry_config.get('backoff_factor', 2)
-        initial_delay = self.retry_config.get('initial_delay', 1.0)
+        if not self.client:
+            self.logger.error("InfluxDB client not initialized")
+            return False
         
-        for attempt in range(max_attempts):
-            try:
-                # Create InfluxDB point
-                point = self._create_point(timestamp, device_id, data)
-                
-                # Write to database
-                influxdb_config = self.config.get_influxdb_config()
-                self.write_api.write(
-                    bucket=influxdb_config['bucket'],
-                    org=influxdb_config['org'],
-                    record=point
-                )
-                
-                self.logger.debug(f"Successfully wrote data for {device_id} to InfluxDB")
-                return True
-                
-            except ApiException as e:
-                self.logger.warning(f"InfluxDB API error on attempt {attempt + 1}: {e}")
+        try:
+            if self._replay_write_api is None:
+                from influxdb_client.client.write_api import SYNCHRONOUS
                 
-            except Exception as e:
-                self.logger.warning(f"Unexpected error writing to InfluxDB on attempt {attempt + 1}: {e}")
+                self._replay_write_api = self.client.write_api(write_options=SYNCHRONOUS)
+            
+            self._replay_write_api.write(
+                bucket=self._bucket,
+                org=self._org,
+                record=lines,
+                write_precision=self._write_precision
+            )
+            return True
+            
+        except Exception as e:
+            status = self._error_status(e)
+            if status in _REJECTED_STATUSES:
+                raise InfluxDBRejectedError(f"InfluxDB rejected {len(lines)} records: {e}") from e
+            if status == _TOO_LARGE_STATUS:
+                raise InfluxDBRequestTooLargeError(f"Request with {len(lines)} records too large: {e}") from e
+            if status in _CONFIG_ERROR_STATUSES:
+                self.logger.error("InfluxDB refused the write with HTTP %s, check the token, org and bucket: %s",
+                                  status, e)
+            else:
+                self.logger.warning("Failed to write %d records to InfluxDB: %s", len(lines), e)
+            return False
+    
+    @staticmethod
+    def _error_status(exception: Exception) -> Optional[int]:
+        """Get the HTTP status of a write error.
+        
+        Args:
+            exception: Error raised by the write API
             
-            # Wait before retry (except on last attempt)
-            if attempt < max_attempts - 1:
-                delay = initial_delay * (backoff_factor ** attempt)
-                self.logger.info(f"Retrying InfluxDB write in {delay:.1f} seconds...")
-                time.sleep(delay)
+        Returns:
+            HTTP status code, or None if the error is not an HTTP response
+        """
+        from influxdb_client.rest import ApiException
         
-        self.logger.error(f"Failed to write data to InfluxDB after {max_attempts} attempts")
-        return False
+        if not isinstance(exception, ApiException):
+            return None
+        return exception.status
+    
+    def _on_batch_success(self, conf: Tuple[str, str, str], data: bytes) -> None:
+        """Log a successfully written batch."""
+        self.logger.debug("Wrote batch to InfluxDB bucket %s", conf[0])
+        if self.on_batch_written:
+            self.on_batch_written(data)
+    
+    def _on_batch_error(self, conf: Tuple[str, str, str], data: bytes, exception: Exception) -> None:
+        """Log a batch that could not be written after all retries."""
+        self.logger.error("Failed to write batch to InfluxDB bucket %s: %s", conf[0], exception)
+        if self.on_batch_failed:
+            self.on_batch_failed(data)
+    
+    def _on_batch_retry(self, conf: Tuple[str, str, str], data: bytes, exception: Exception) -> None:
+        """Log a retryable batch write error."""
+        self.logger.warning("Retrying InfluxDB batch write to bucket %s: %s", conf[0], exception)
     
-    def _create_point(self, timestamp: datetime, device_id: str, data: Dict[str, Any]) -> Point:
-        """Create an InfluxDB Point from sensor data.
+    @staticmethod
+    def _line_prefix(device_id: str) -> str:
+        """Build the measurement and tag part of a line protocol record.
         
         Args:
-            timestamp: Data timestamp
             device_id: Device identifier
-            data: Sensor data dictionary
             
         Returns:
-            InfluxDB Point object
+            Line protocol prefix including the trailing space
         """
-        point = Point("sensor_data").tag("device", device_id).time(timestamp, WritePrecision.S)
+        return f"{MEASUREMENT},device={str(device_id).translate(_ESCAPE_KEY)} "
+    
+    def build_line(self, timestamp: Union[datetime, int], device_id: str,
+                   data: Dict[str, Any]) -> Optional[str]:
+        """Build an InfluxDB line protocol record from sensor data.
         
+        Args:
+            timestamp: Data timestamp, or epoch nanoseconds as an int
+            device_id: Device identifier
+            data: Sensor data dictionary
+            
+        Returns:
+            Line protocol string, or None if there are no writable fields
+        """
+        fields = []
         for field_name, value in data.items():
-            if isinstance(value, (int, float)):
-                point.field(field_name, float(value))
+            key = field_name.translate(_ESCAPE_KEY)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                # Line protocol cannot represent NaN or infinity
+                if math.isfinite(value):
+                    fields.append(f"{key}={float(value)}")
             else:
-                point.field(field_name, str(value))
+                fields.append(f'{key}="{str(value).translate(_ESCAPE_STRING)}"')
+        
+        if not fields:
+            return None
+        
+        prefix = self._lp_prefix if device_id == self._device_id else self._line_prefix(device_id)
+        return f"{prefix}{','.join(fields)} {self._to_epoch_seconds(timestamp)}"
+    
+    @staticmethod
+    def _to_epoch_seconds(timestamp: Union[datetime, int]) -> int:
+        """Convert a timestamp to integer epoch seconds.
         
-        return point
+        Naive timestamps are treated as UTC, matching the InfluxDB client.
+        
+        Args:
+            timestamp: Data timestamp, or epoch nanoseconds as an int
+            
+        Returns:
+            Seconds since the Unix epoch
+        """
+        if isinstance(timestamp, int):
+            return timestamp // 1_000_000_000
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp())
     
     def test_connection(self) -> bool:
         """Test InfluxDB connection.
@@ -155,7 +343,7 @@ class InfluxDBManager:
             return health.status == "pass"
             
         except Exception as e:
-            self.logger.error(f"InfluxDB connection test failed: {e}")
+            self.logger.error("InfluxDB connection test failed: %s", e)
             return False
     
     def get_database_info(self) -> Dict[str, Any]:
@@ -169,28 +357,30 @@ class InfluxDBManager:
                 return {"status": "not_connected"}
             
             health = self.client.health()
-            influxdb_config = self.config.get_influxdb_config()
             
             return {
                 "status": health.status,
                 "message": health.message,
-                "url": influxdb_config['url'],
-                "org": influxdb_config['org'],
-                "bucket": influxdb_config['bucket']
+                "url": self.client.url,
+                "org": self._org,
+                "bucket": self._bucket
             }
             
         except Exception as e:
-            self.logger.error(f"Failed to get database info: {e}")
+            self.logger.error("Failed to get database info: %s", e)
             return {"status": "error", "message": str(e)}
     
     def close(self) -> None:
-        """Close InfluxDB client connection."""
+        """Flush pending writes and close InfluxDB client connection."""
         try:
+            if self.write_api:
+                # Closing the batching write API drains buffered points
+                self.write_api.close()
             if self.client:
                 self.client.close()
                 self.logger.info("InfluxDB connection closed")
         except Exception as e:
-            self.logger.error(f"Error closing InfluxDB connection: {e}")
+            self.logger.error("Error closing InfluxDB connection: %s", e)
     
     def __enter__(self):
         """Context manager entry."""
@@ -0,0 +1,273 @@
+"""Disk-backed replay of daily log records not yet acknowledged by InfluxDB."""
+
+import os
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .influxdb_client import InfluxDBRejectedError, InfluxDBRequestTooLargeError
+
+
+# Position in the daily logs: (log date as YYYY-MM-DD, byte offset in that day's file)
+LogPosition = Tuple[str, int]
+
+
+class ReplayLog:
+    """Tracks InfluxDB acknowledgements against the daily line protocol logs.
+    
+    Every record appended to a daily log is registered with its end position.
+    As the batching write API reports written batches, the acknowledged
+    position advances past the oldest contiguous run of written records and
+    is persisted to the offset file. After a failed batch, or on startup, the
+    records following that position are replayed from disk. Records InfluxDB
+    rejects as invalid are moved to a quarantine file instead of being
+    retried.
+    """
+    
+    def __init__(self, log_base_dir: str, daily_log_file: str, offset_file: str,
+                 rejected_file: str = 'influxdb.rejected', max_pending: int = 10000) -> None:
+        """Initialize replay log.
+        
+        Args:
+            log_base_dir: Directory containing the per-date log folders
+            daily_log_file: File name of each daily log
+            offset_file: File name, relative to log_base_dir, of the offset record
+            rejected_file: File name, relative to log_base_dir, receiving
+                records InfluxDB rejected
+            max_pending: Maximum number of records tracked in memory; beyond
+                it the oldest are left to be replayed from disk
+        """
+        self.logger = logging.getLogger(__name__)
+        self._log_base_dir = log_base_dir
+        self._daily_log_file = daily_log_file
+        self._offset_path = os.path.join(log_base_dir, offset_file)
+        self._rejected_path = os.path.join(log_base_dir, rejected_file)
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        # Encoded record -> [end position, written]; insertion order is file order
+        self._pending: "OrderedDict[bytes, list]" = OrderedDict()
+        self._acked: Optional[LogPosition] = self._load_offset()
+        # Until a replay succeeds, acknowledgements must not skip unwritten records
+        self._replay_needed = self._acked is not None
+    
+    @property
+    def replay_needed(self) -> bool:
+        """Whether unacknowledged records are waiting to be replayed."""
+        return self._replay_needed
+    
+    def record_written(self, line: str, date: str, start: int, end: int) -> None:
+        """Register a record appended to a daily log.
+        
+        Args:
+            line: Line protocol record, without the trailing newline
+            date: Date of the daily log the record was written to
+            start: Byte offset of the record in the daily log
+            end: Byte offset just past the record's newline
+        """
+        with self._lock:
+            if self._acked is None:
+                self._advance((date, start))
+            self._pending[line.encode()] = [(date, end), False]
+            
+            if len(self._pending) > self._max_pending:
+                # The offset cannot pass an untracked record, so the disk
+                # replay takes over from the oldest one
+                self._replay_needed = True
+                self._pending.popitem(last=False)
+    
+    def mark_failed(self) -> None:
+        """Flag that a registered record could not be handed to InfluxDB."""
+        with self._lock:
+            self._replay_needed = True
+    
+    def on_batch_success(self, data: bytes) -> None:
+        """Acknowledge the records of a batch written by InfluxDB.
+        
+        Args:
+            data: Newline-separated line protocol body of the batch
+        """
+        with self._lock:
+            for line in data.split(b'\n'):
+                entry = self._pending.get(line)
+                if entry is not None:
+                    entry[1] = True
+            
+            if self._replay_needed:
+                return
+            
+            position = None
+            while self._pending and next(iter(self._pending.values()))[1]:
+                position = self._pending.popitem(last=False)[1][0]
+            
+            if position is not None:
+                self._advance(position)
+    
+    def on_batch_error(self, data: bytes) -> None:
+        """Record that a batch was dropped after the client gave up retrying.
+        
+        Args:
+            data: Newline-separated line protocol body of the batch
+        """
+        with self._lock:
+            self._replay_needed = True
+    
+    def iter_unacknowledged(self, chunk_size: int = 5000) -> Iterator[Tuple[List[bytes], LogPosition]]:
+        """Read unacknowledged records from the daily logs in chunks.
+        
+        Args:
+            chunk_size: Maximum number of records per chunk
+        
+        Yields:
+            Tuple of (records, position just past the last record in the chunk)
+        """
+        if self._acked is None:
+            return
+        
+        start_date, start_offset = self._acked
+        for date in self._log_dates_from(start_date):
+            path = os.path.join(self._log_base_dir, date, self._daily_log_file)
+            with open(path, 'rb') as f:
+                f.seek(start_offset if date == start_date else 0)
+                chunk: List[bytes] = []
+                end = f.tell()
+                
+                while True:
+                    line = f.readline()
+                    # Stop at EOF or at a partially written record
+                    if not line.endswith(b'\n'):
+                        break
+                    end = f.tell()
+                    
+                    record = line.rstrip(b'\r\n')
+                    if record:
+                        chunk.append(record)
+                    if len(chunk) >= chunk_size:
+                        yield chunk, (date, end)
+                        chunk = []
+                
+                if chunk:
+                    yield chunk, (date, end)
+    
+    def acknowledge(self, position: LogPosition) -> None:
+        """Acknowledge all records up to a position after replaying them.
+        
+        Args:
+            position: Position just past the last replayed record
+        """
+        with self._lock:
+            while self._pending and next(iter(self._pending.values()))[0] <= position:
+                self._pending.popitem(last=False)
+            self._advance(position)
+    
+    def replay(self, write_lines: Callable[[List[bytes]], bool], chunk_size: int = 5000) -> Optional[int]:
+        """Replay unacknowledged records, quarantining any that InfluxDB rejects.
+        
+        Args:
+            write_lines: Writes a chunk of records; returns False if the write
+                may succeed when retried and raises InfluxDBRejectedError if
+                records were rejected or InfluxDBRequestTooLargeError if the
+                chunk must be split
+            chunk_size: Maximum number of records per write
+            
+        Returns:
+            Number of records replayed, or None if a write failed and the
+            replay should be retried later
+        """
+        replayed = 0
+        
+        for lines, position in self.iter_unacknowledged(chunk_size):
+            if not self._write_or_quarantine(write_lines, lines):
+                self.logger.warning("Replay to InfluxDB stopped after %d records, will retry", replayed)
+                return None
+            
+            self.acknowledge(position)
+            replayed += len(lines)
+        
+        self.finish_replay()
+        return replayed
+    
+    def _write_or_quarantine(self, write_lines: Callable[[List[bytes]], bool], lines: List[bytes]) -> bool:
+        """Write records, splitting a rejected chunk until the rejected records are isolated.
+        
+        Chunks too large for InfluxDB are split as well, but are never
+        quarantined.
+        
+        Returns:
+            False if a write failed and may succeed when retried, True otherwise
+        """
+        try:
+            return write_lines(lines)
+        except InfluxDBRequestTooLargeError as e:
+            if len(lines) == 1:
+                self.logger.error("InfluxDB refused a single record as too large: %s", e)
+                return False
+        except InfluxDBRejectedError as e:
+            if len(lines) == 1:
+                self.quarantine(lines, e)
+                return True
+        
+        middle = len(lines) // 2
+        return (self._write_or_quarantine(write_lines, lines[:middle])
+                and self._write_or_quarantine(write_lines, lines[middle:]))
+    
+    def quarantine(self, lines: List[bytes], reason: Exception) -> None:
+        """Append records InfluxDB rejected to the quarantine file.
+        
+        Args:
+            lines: Rejected line protocol records
+            reason: Error InfluxDB returned for them
+        """
+        self.logger.error("Quarantining %d records rejected by InfluxDB to %s: %s",
+                          len(lines), self._rejected_path, reason)
+        try:
+            with open(self._rejected_path, 'ab') as f:
+                for line in lines:
+                    f.write(line + b'\n')
+        except OSError as e:
+            self.logger.error("Failed to write quarantined records: %s", e)
+    
+    def finish_replay(self) -> None:
+        """Mark the replay complete so acknowledgements advance again."""
+        with self._lock:
+            self._replay_needed = False
+    
+    def _log_dates_from(self, start_date: str) -> List[str]:
+        """List daily log dates on or after a date, oldest first."""
+        try:
+            entries = os.listdir(self._log_base_dir)
+        except FileNotFoundError:
+            return []
+        
+        return sorted(
+            entry for entry in entries
+            if entry >= start_date
+            and os.path.isfile(os.path.join(self._log_base_dir, entry, self._daily_log_file))
+        )
+    
+    def _advance(self, position: LogPosition) -> None:
+        """Move the acknowledged position forward and persist it."""
+        if self._acked is not None and position <= self._acked:
+            return
+        
+        self._acked = position
+        try:
+            tmp_path = self._offset_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'date': position[0], 'offset': position[1]}, f)
+            os.replace(tmp_path, self._offset_path)
+        except OSError as e:
+            self.logger.error("Failed to save replay offset: %s", e)
+    
+    def _load_offset(self) -> Optional[LogPosition]:
+        """Load the persisted acknowledged position, if any."""
+        try:
+            with open(self._offset_path, 'r') as f:
+                state = json.load(f)
+            return state['date'], int(state['offset'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning("Ignoring unreadable replay offset file: %s", e)
+            return None
@@ -0,0 +1,366 @@
+"""Main application for the weather monitoring system."""
+
+import sys
+import os
+import time
+import queue
+import select
+import logging
+import signal
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from pathlib import Path
+from typing import Optional, TextIO
+
+from .config import ConfigManager
+from .radio import LoRaReceiver
+from .database import InfluxDBManager, ReplayLog
+from .processing import DataProcessor
+
+
+class WeatherMonitorApp:
+    """Main weather monitoring application."""
+    
+    def __init__(self, config_path: Optional[str] = None) -> None:
+        """Initialize the weather monitoring application.
+        
+        Args:
+            config_path: Path to configuration file (optional)
+        """
+        self.config: Optional[ConfigManager] = None
+        self.lora_receiver: Optional[LoRaReceiver] = None
+        self.influxdb_manager: Optional[InfluxDBManager] = None
+        self.data_processor: Optional[DataProcessor] = None
+        self.replay_log: Optional[ReplayLog] = None
+        self.logger: Optional[logging.Logger] = None
+        self.running = False
+        self._log_listener: Optional[QueueListener] = None
+        self._wakeup_r: Optional[int] = None
+        self._wakeup_w: Optional[int] = None
+        self._device_id: Optional[str] = None
+        self._log_base_dir: Optional[str] = None
+        self._daily_log_file: Optional[str] = None
+        self._log_fp: Optional[TextIO] = None
+        self._log_date: Optional[str] = None
+        # UTC day number of the open daily log
+        self._log_day: Optional[int] = None
+        
+        self._initialize(config_path)
+    
+    def _initialize(self, config_path: Optional[str] = None) -> None:
+        """Initialize all components."""
+        try:
+            # Load configuration
+            self.config = ConfigManager(config_path)
+            
+            # Setup logging
+            self._setup_logging()
+            self.logger = logging.getLogger(__name__)
+            
+            # Cache per-message configuration values
+            storage_config = self.config.get_storage_config()
+            self._device_id = self.config.get_device_config()['id']
+            self._log_base_dir = storage_config['log_base_dir']
+            self._daily_log_file = storage_config['daily_log_file']
+            
+            # Initialize components
+            self.data_processor = DataProcessor(self.config)
+            self.influxdb_manager = InfluxDBManager(self.config)
+            self.lora_receiver = LoRaReceiver(self.config)
+            
+            # Track InfluxDB acknowledgements so the daily logs double as a replay queue
+            self.replay_log = ReplayLog(
+                self._log_base_dir,
+                self._daily_log_file,
+                storage_config.get('replay_offset_file', 'influxdb.offset'),
+                storage_config.get('replay_rejected_file', 'influxdb.rejected')
+            )
+            self.influxdb_manager.on_batch_written = self.replay_log.on_batch_success
+            self.influxdb_manager.on_batch_failed = self.replay_log.on_batch_error
+            self._replay_unacknowledged()
+            
+            # Setup signal handlers; the wakeup pipe lets waits return as soon as a signal arrives
+            self._wakeup_r, self._wakeup_w = os.pipe()
+            os.set_blocking(self._wakeup_r, False)
+            os.set_blocking(self._wakeup_w, False)
+            signal.set_wakeup_fd(self._wakeup_w)
+            self.lora_receiver.set_wakeup_fd(self._wakeup_r)
+            
+            signal.signal(signal.SIGINT, self._signal_handler)
+            signal.signal(signal.SIGTERM, self._signal_handler)
+            
+            self.logger.info("Weather monitoring system initialized successfully")
+            
+        except Exception as e:
+            print(f"Failed to initialize weather monitoring system: {e}")
+            # Flush records logged before the failure; __exit__ never runs
+            if self._log_listener:
+                self._log_listener.stop()
+                self._log_listener = None
+            sys.exit(1)
+    
+    def _setup_logging(self) -> None:
+        """Setup logging configuration.
+        
+        Records are queued by the calling thread and written to the console
+        and log file by a background listener thread. The queue is a
+        SimpleQueue, whose put() is reentrant, so the signal handler can log
+        while the main thread is inside a put().
+        """
+        log_config = self.config.get_logging_config()
+        formatter = logging.Formatter(
+            log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        )
+        
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        file_handler = WatchedFileHandler('weather_monitor.log')
+        file_handler.setFormatter(formatter)
+        
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._log_listener = QueueListener(log_queue, stream_handler, file_handler)
+        
+        root_logger = logging.getLogger()
+        # Replace handlers installed by log calls made before setup, e.g. at import time
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        root_logger.setLevel(getattr(logging, log_config.get('level', 'INFO')))
+        root_logger.addHandler(QueueHandler(log_queue))
+        
+        self._log_listener.start()
+    
+    def _signal_handler(self, signum, frame) -> None:
+        """Handle shutdown signals."""
+        self.logger.info("Received signal %s, shutting down gracefully...", signum)
+        self.running = False
+    
+    def _wait(self, timeout: float) -> None:
+        """Sleep for up to timeout seconds, returning early on a signal."""
+        readable, _, _ = select.select([self._wakeup_r], [], [], timeout)
+        if readable:
+            # Drain wakeup bytes so the next wait blocks again
+            try:
+                while os.read(self._wakeup_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+    
+    def _save_to_file(self, timestamp_ns: int, line: str) -> bool:
+        """Save a line protocol record to the daily log file.
+        
+        The open file is rotated when the UTC date of the timestamp, given in
+        epoch nanoseconds, changes.
+        """
+        try:
+            seconds = timestamp_ns // 1_000_000_000
+            day = seconds // 86400
+            if day != self._log_day:
+                self._close_log_file()
+                today = time.strftime("%Y-%m-%d", time.gmtime(seconds))
+                
+                # Create daily log folder
+                log_dir = os.path.join(self._log_base_dir, today)
+                os.makedirs(log_dir, exist_ok=True)
+                
+                log_file_path = os.path.join(log_dir, self._daily_log_file)
+                # ReplayLog reads the log as bytes and keys records by their
+                # UTF-8 encoding, so the file must be UTF-8 whatever the locale
+                self._log_fp = open(log_file_path, 'a', encoding='utf-8', newline='\n', buffering=8192)
+                self._log_date = today
+                self._log_day = day
+            
+            # Save to file
+            start = self._log_fp.tell()
+            self._log_fp.write(line)
+            self._log_fp.write('\n')
+            self._log_fp.flush()
+            
+            self.replay_log.record_written(line, self._log_date, start, self._log_fp.tell())
+            
+            return True
+            
+        except Exception as e:
+            # Force the file to be reopened on the next message
+            self._log_day = None
+            if self.logger:
+                self.logger.error("Failed to save data to file: %s", e)
+            return False
+    
+    def _close_log_file(self) -> None:
+        """Close the current daily log file, if open."""
+        if self._log_fp:
+            self._log_fp.close()
+        self._log_fp = None
+        self._log_date = None
+        self._log_day = None
+    
+    def _replay_unacknowledged(self) -> None:
+        """Replay daily log records that InfluxDB has not acknowledged."""
+        replayed = self.replay_log.replay(self.influxdb_manager.write_lines)
+        if replayed:
+            self.logger.info("Replayed %d unacknowledged records to InfluxDB", replayed)
+    
+    def _process_received_message(self, message: str) -> bool:
+        """Process a received message and store it."""
+        try:
+            device_id = self._device_id
+            
+            # Process and validate data
+            timestamp_ns, processed_data = self.data_processor.process_message_ns(message, device_id)
+            
+            # Format once as line protocol, shared by the file log and InfluxDB
+            line = self.influxdb_manager.build_line(timestamp_ns, device_id, processed_data)
+            if line is None:
+                self.logger.warning("Message from %s has no writable fields", device_id)
+                return False
+            
+            # Save to file
+            file_success = self._save_to_file(timestamp_ns, line)
+            
+            # Save to InfluxDB; a record that was logged but not queued is replayed later
+            db_success = self.influxdb_manager.write_line(line)
+            if file_success and not db_success:
+                self.replay_log.mark_failed()
+            
+            # Log statistics
+            if self.logger.isEnabledFor(logging.INFO):
+                stats = self.data_processor.get_field_statistics(processed_data)
+                self.logger.info("Processed message: total=%d numeric=%d",
+                                 stats['total_fields'], stats['numeric_fields'])
+            
+            return file_success and db_success
+            
+        except Exception as e:
+            self.logger.error("Failed to process message: %s", e)
+            return False
+    
+    def run_single_cycle(self) -> bool:
+        """Run a single cycle of handshake and receive."""
+        try:
+            device_id = self._device_id
+            
+            # Catch up on records that failed to reach InfluxDB
+            if self.replay_log.replay_needed:
+                self._replay_unacknowledged()
+            
+            # Send handshake
+            if not self.lora_receiver.send_handshake():
+                self.logger.warning("Failed to send handshake message")
+                return False
+            
+            # Wait for response
+            time.sleep(1)
+            
+            # Listen for device message
+            message = self.lora_receiver.listen_for_device(device_id)
+            
+            if message:
+                return self._process_received_message(message)
+            else:
+                self.logger.info("No message received from device")
+                return False
+                
+        except Exception as e:
+            self.logger.error("Error in single cycle: %s", e)
+            return False
+    
+    def run_continuous(self, interval: int = 300) -> None:
+        """Run continuous monitoring with specified interval.
+        
+        Args:
+            interval: Monitoring interval in seconds (default: 5 minutes)
+        """
+        self.logger.info("Starting continuous monitoring with %ss interval", interval)
+        self.running = True
+        
+        while self.running:
+            try:
+                start_time = time.monotonic()
+                
+                # Run monitoring cycle
+                success = self.run_single_cycle()
+                
+                if success:
+                    self.logger.info("Monitoring cycle completed successfully")
+                else:
+                    self.logger.warning("Monitoring cycle completed with issues")
+                
+                # Calculate remaining sleep time
+                elapsed = time.monotonic() - start_time
+                sleep_time = max(0, interval - elapsed)
+                
+                if sleep_time > 0 and self.running:
+                    self.logger.debug("Sleeping for %.1f seconds", sleep_time)
+                    self._wait(sleep_time)
+                
+            except KeyboardInterrupt:
+                self.logger.info("Received keyboard interrupt")
+                break
+            except Exception as e:
+                self.logger.error("Unexpected error in continuous mode: %s", e)
+                if self.running:
+                    self._wait(10)  # Brief pause before retrying
+        
+        self.logger.info("Continuous monitoring stopped")
+    
+    def cleanup(self) -> None:
+        """Cleanup resources."""
+        self.logger.info("Cleaning up resources...")
+        
+        if self.influxdb_manager:
+            self.influxdb_manager.close()
+        
+        if self.lora_receiver:
+            self.lora_receiver.close()
+        
+        self._close_log_file()
+        
+        if self._wakeup_w is not None:
+            signal.set_wakeup_fd(-1)
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+            self._wakeup_r = self._wakeup_w = None
+        
+        self.logger.info("Weather monitoring system shutdown complete")
+        
+        # Drain queued log records before exiting
+        if self._log_listener:
+            self._log_listener.stop()
+            self._log_listener = None
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.cleanup()
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Weather Monitoring System')
+    parser.add_argument('--config', '-c', help='Path to configuration file')
+    parser.add_argument('--single', '-s', action='store_true', 
+                       help='Run single monitoring cycle instead of continuous')
+    parser.add_argument('--interval', '-i', type=int, default=300,
+                       help='Monitoring interval in seconds for continuous mode (default: 300)')
+    
+    args = parser.parse_args()
+    
+    try:
+        with WeatherMonitorApp(args.config) as app:
+            if args.single:
+                success = app.run_single_cycle()
+                sys.exit(0 if success else 1)
+            else:
+                app.run_continuous(args.interval)
+    
+    except Exception as e:
+        print(f"Application failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -1,12 +1,35 @@
 """Data processor for sensor validation and transformation."""
 
 import re
+import time
 import logging
-from typing import Dict, Any, Optional, Tuple
-from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
 
 from ..config.config_manager import ConfigManager
 
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# One comma-separated "<field>:<value>" token; the field runs to the first colon
+# and the value to the next comma, both without surrounding whitespace. Tokens
+# without a colon or without a field name are skipped whole
+_FIELD_RE = re.compile(r'\s*([^:,\s][^:,]*?)\s*:\s*([^,]*?)\s*(?:,|$)')
+
+# First characters float() can accept; other values are kept as strings without trying
+_NUMERIC_START = frozenset("0123456789+-.iInN")
+
+
+def _parse_number(value: str) -> Optional[float]:
+    """Parse a field value as a float, or return None if it is not numeric."""
+    if value[:1] in _NUMERIC_START:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return None
+
 
 class DataValidationError(Exception):
     """Raised when data validation fails."""
@@ -27,6 +50,49 @@ class DataProcessor:
         self.field_mappings = config.get_data_processing_config().get('field_mappings', {})
         self.validation_config = config.get_data_processing_config().get('validation', {})
         
+        # (min, max) per output field name, either bound may be None
+        self._field_spec = self._build_field_spec()
+        # Raw message field name -> (output field name, range or None)
+        self._raw_to_spec = {
+            raw_name: (mapped_name, self._field_spec.get(mapped_name))
+            for raw_name, mapped_name in self.field_mappings.items()
+        }
+        # Raw message field name -> (output field name, converter specialized to its range)
+        self._raw_converters = {
+            raw_name: (mapped_name, self._make_converter(mapped_name, value_range))
+            for raw_name, (mapped_name, value_range) in self._raw_to_spec.items()
+        }
+        # Device ID -> expected "ID:<device>," message prefix
+        self._id_prefix_cache: Dict[str, str] = {}
+    
+    def _build_field_spec(self) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """Resolve validation ranges to the output field names they apply to.
+        
+        A validation key applies to the field of the same name, and to every
+        mapped field name containing it as a category, case-insensitively
+        (``temperature`` covers ``temperature_C``). An exact name takes
+        precedence over a category; the first matching category wins.
+        
+        Returns:
+            Dictionary of field names to (min, max) tuples
+        """
+        ranges = {
+            name: (range_config.get('min'), range_config.get('max'))
+            for name, range_config in self.validation_config.items()
+        }
+        
+        field_spec = dict(ranges)
+        for mapped_name in self.field_mappings.values():
+            if mapped_name in field_spec:
+                continue
+            lowered = mapped_name.lower()
+            for category, value_range in ranges.items():
+                if category.lower() in lowered:
+                    field_spec[mapped_name] = value_range
+                    break
+        
+        return field_spec
+        
     def process_message(self, message: str, device_id: str) -> Tuple[datetime, Dict[str, Any]]:
         """Process raw LoRa message and extract sensor data.
         
@@ -40,133 +106,249 @@ class DataProcessor:
         Raises:
             DataValidationError: If message format is invalid or data is out of range
         """
-        self.logger.debug(f"Processing message from {device_id}: {message}")
+        timestamp_ns, processed_data = self.process_message_ns(message, device_id)
+        return datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc), processed_data
+    
+    def process_message_ns(self, message: str, device_id: str) -> Tuple[int, Dict[str, Any]]:
+        """Process raw LoRa message, timestamping it in epoch nanoseconds.
+        
+        Args:
+            message: Raw message from LoRa device
+            device_id: Expected device ID
+            
+        Returns:
+            Tuple of (timestamp in nanoseconds since the Unix epoch, processed_data_dict)
+            
+        Raises:
+            DataValidationError: If message format is invalid or data is out of range
+        """
+        self.logger.debug("Processing message from %s: %s", device_id, message)
+        
+        # Validate the "ID:<device>," prefix, then scan the remaining fields once
+        msg = message.strip() if isinstance(message, str) else ''
+        prefix = self._id_prefix(device_id)
+        data_start = len(prefix)
         
-        # Validate message format
-        if not self._validate_message_format(message, device_id):
+        if not msg.startswith(prefix):
+            self.logger.warning("Message does not start with expected device ID %s", device_id)
             raise DataValidationError(f"Invalid message format or device ID mismatch: {message}")
         
-        # Extract data fields
-        raw_data = self._extract_data_fields(message)
+        # Extract, rename and validate the fields in one pass
+        processed_data = {}
+        raw_converters = self._raw_converters
+        for field_name, value in _FIELD_RE.findall(msg, data_start):
+            converter = raw_converters.get(field_name)
+            if converter is None:
+                # Unmapped field, validated by its own name
+                processed_data[field_name] = self._validate_field_value(field_name, value)
+            else:
+                processed_data[converter[0]] = converter[1](value)
         
-        # Validate and transform data
-        processed_data = self._validate_and_transform_data(raw_data)
+        if not processed_data:
+            self.logger.warning("Message contains no data fields: %s", message)
+            raise DataValidationError(f"Invalid message format or device ID mismatch: {message}")
         
         # Generate timestamp
-        timestamp = datetime.utcnow()
+        timestamp_ns = time.time_ns()
         
-        self.logger.info(f"Successfully processed message from {device_id}")
-        return timestamp, processed_data
+        self.logger.info("Successfully processed message from %s", device_id)
+        return timestamp_ns, processed_data
     
-    def _validate_message_format(self, message: str, expected_device_id: str) -> bool:
-        """Validate basic message format and device ID.
+    def process_batch(self, messages: List[str], device_id: str) -> Dict[str, "np.ndarray"]:
+        """Process a batch of raw messages into one float32 column per field.
         
-        Args:
-            message: Raw message to validate
-            expected_device_id: Expected device ID
-            
-        Returns:
-            True if message format is valid
-        """
-        if not message or not isinstance(message, str):
-            self.logger.warning("Empty or invalid message format")
-            return False
-        
-        # Check if message contains expected device ID
-        if expected_device_id not in message:
-            self.logger.warning(f"Message does not contain expected device ID {expected_device_id}")
-            return False
-        
-        # Basic pattern matching for data format (ID:DeviceX, field1:value1, field2:value2,...)
-        pattern = rf'ID:{expected_device_id}(?:,\s*[\w_]+:[\w.+-]+)+'
-        if not re.match(pattern, message.strip()):
-            self.logger.warning(f"Message format does not match expected pattern: {message}")
-            return False
-        
-        return True
-    
-    def _extract_data_fields(self, message: str) -> Dict[str, str]:
-        """Extract data fields from message.
+        Intended for bulk work such as re-processing stored messages; the
+        live receive path uses process_message. Ranges are checked once per
+        column over the whole batch, on the parsed float64 values, before the
+        columns are narrowed to float32. Fields missing from a message are NaN;
+        non-numeric values of fields without a range are not columnar and
+        are left out.
         
         Args:
-            message: Raw message containing field data
+            messages: Raw messages from the LoRa device
+            device_id: Expected device ID
             
         Returns:
-            Dictionary of field names to string values
+            Dictionary of output field names to arrays of len(messages) values
+            
+        Raises:
+            DataValidationError: If any message has an invalid format or no
+                data fields, or any value is non-numeric or out of range for
+                its field
+            ImportError: If numpy is not installed
         """
-        # Remove device ID prefix
-        message = re.sub(r'ID:\w+,?\s*', '', message)
+        import numpy as np
+        
+        count = len(messages)
+        prefix = self._id_prefix(device_id)
+        data_start = len(prefix)
+        raw_to_spec = self._raw_to_spec
+        field_spec = self._field_spec
+        columns: Dict[str, Any] = {}
         
-        # Split into field:value pairs
-        field_pairs = [pair.strip() for pair in message.split(',')]
+        for index, message in enumerate(messages):
+            msg = message.strip() if isinstance(message, str) else ''
+            if not msg.startswith(prefix):
+                raise DataValidationError(
+                    f"Invalid message format or device ID mismatch in message {index}: {message}")
+            
+            fields = _FIELD_RE.findall(msg, data_start)
+            if not fields:
+                raise DataValidationError(f"Message {index} contains no data fields: {message}")
+            
+            for field_name, value in fields:
+                spec = raw_to_spec.get(field_name)
+                if spec is None:
+                    spec = (field_name, field_spec.get(field_name))
+                name, value_range = spec
+                
+                numeric_value = _parse_number(value)
+                if numeric_value is None:
+                    if value_range is not None:
+                        raise DataValidationError(
+                            f"{name} value {value!r} is not numeric in message {index}")
+                    continue
+                
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = np.full(count, np.nan, dtype=np.float64)
+                column[index] = numeric_value
         
-        data = {}
-        for pair in field_pairs:
-            if ':' in pair:
-                field, value = pair.split(':', 1)
-                data[field.strip()] = value.strip()
+        # NaN compares false, so missing values never fail a range check
+        for name, column in columns.items():
+            value_range = field_spec.get(name)
+            if not value_range:
+                continue
+            min_val, max_val = value_range
+            
+            if min_val is not None and np.any(column < min_val):
+                index = int(np.argmax(column < min_val))
+                raise DataValidationError(
+                    f"{name} value {column[index]} below minimum {min_val} in message {index}")
+            
+            if max_val is not None and np.any(column > max_val):
+                index = int(np.argmax(column > max_val))
+                raise DataValidationError(
+                    f"{name} value {column[index]} above maximum {max_val} in message {index}")
         
-        return data
+        return {name: column.astype(np.float32) for name, column in columns.items()}
+    
+    def _id_prefix(self, device_id: str) -> str:
+        """Return the cached "ID:<device>," prefix a device's messages start with."""
+        prefix = self._id_prefix_cache.get(device_id)
+        if prefix is None:
+            prefix = self._id_prefix_cache[device_id] = f"ID:{device_id},"
+        return prefix
     
-    def _validate_and_transform_data(self, raw_data: Dict[str, str]) -> Dict[str, Any]:
-        """Validate data ranges and transform field names.
+    def _validate_field_value(self, field_name: str, value: str) -> Any:
+        """Validate individual field value against configured ranges.
         
         Args:
-            raw_data: Raw field data as strings
+            field_name: Name of the field
+            value: String value to validate
             
         Returns:
-            Validated and transformed data dictionary
+            Converted and validated value
             
         Raises:
-            DataValidationError: If validation fails
+            DataValidationError: If value is out of valid range, or is not
+                numeric for a field with a configured range
         """
-        processed_data = {}
+        return self._convert_value(field_name, value, self._field_spec.get(field_name))
+    
+    def _make_converter(self, field_name: str,
+                        value_range: Optional[Tuple[Optional[float], Optional[float]]]) -> Callable[[str], Any]:
+        """Build a converter for one field with its range bound in.
         
-        for field_name, value in raw_data.items():
-            # Apply field name mappings
-            mapped_name = self.field_mappings.get(field_name, field_name)
+        The converter accepts in-range values with one parse and one
+        comparison; anything else goes through _convert_value, which reports
+        the failure. Results are identical to _convert_value.
+        
+        Args:
+            field_name: Output name of the field
+            value_range: (min, max) for the field, or None if not validated
             
-            # Validate and convert value
-            validated_value = self._validate_field_value(mapped_name, value)
-            processed_data[mapped_name] = validated_value
+        Returns:
+            Function converting a raw string value
+        """
+        convert_value = self._convert_value
+        
+        if value_range is None:
+            def convert(value: str) -> Any:
+                numeric_value = _parse_number(value)
+                return value if numeric_value is None else numeric_value
+            return convert
         
-        return processed_data
+        min_val, max_val = value_range
+        low = float('-inf') if min_val is None else min_val
+        high = float('inf') if max_val is None else max_val
+        
+        def convert(value: str) -> Any:
+            numeric_value = _parse_number(value)
+            if numeric_value is not None and low <= numeric_value <= high:
+                return numeric_value
+            return convert_value(field_name, value, value_range)
+        return convert
     
-    def _validate_field_value(self, field_name: str, value: str) -> Any:
-        """Validate individual field value against configured ranges.
+    def _convert_value(self, field_name: str, value: str,
+                       value_range: Optional[Tuple[Optional[float], Optional[float]]]) -> Any:
+        """Convert a field value and check it against a resolved range.
         
         Args:
             field_name: Name of the field
             value: String value to validate
+            value_range: (min, max) for the field, or None if not validated
             
         Returns:
             Converted and validated value
             
         Raises:
-            DataValidationError: If value is out of valid range
+            DataValidationError: If value is out of range, or is not numeric
+                while a range is configured
+        """
+        ok, result, error = self._check_field_value(field_name, value, value_range)
+        if not ok:
+            raise DataValidationError(error)
+        return result
+    
+    def _check_field_value(self, field_name: str, value: str,
+                           value_range: Optional[Tuple[Optional[float], Optional[float]]]
+                           ) -> Tuple[bool, Any, Optional[str]]:
+        """Convert a field value and check it against a resolved range without raising.
+        
+        Values _parse_number does not accept are kept as strings; every
+        conversion path parses values the same way.
+        
+        Args:
+            field_name: Name of the field
+            value: String value to validate
+            value_range: (min, max) for the field, or None if not validated
+            
+        Returns:
+            Tuple of (valid, converted value, error message or None)
         """
         # Try to convert to float for numeric fields
-        try:
-            numeric_value = float(value)
-        except ValueError:
+        numeric_value = _parse_number(value)
+        if numeric_value is None:
+            # Fields with configured ranges must be numeric
+            if value_range is not None:
+                return False, value, f"{field_name} value {value!r} is not numeric"
             # Keep as string if not numeric
-            return value
+            return True, value, None
         
         # Check validation ranges if configured
-        if field_name in self.validation_config:
-            range_config = self.validation_config[field_name]
-            min_val = range_config.get('min')
-            max_val = range_config.get('max')
+        if value_range:
+            min_val, max_val = value_range
             
             if min_val is not None and numeric_value < min_val:
-                self.logger.warning(f"Value {numeric_value} for {field_name} below minimum {min_val}")
-                raise DataValidationError(f"{field_name} value {numeric_value} below minimum {min_val}")
+                self.logger.warning("Value %s for %s below minimum %s", numeric_value, field_name, min_val)
+                return False, numeric_value, f"{field_name} value {numeric_value} below minimum {min_val}"
             
             if max_val is not None and numeric_value > max_val:
-                self.logger.warning(f"Value {numeric_value} for {field_name} above maximum {max_val}")
-                raise DataValidationError(f"{field_name} value {numeric_value} above maximum {max_val}")
+                self.logger.warning("Value %s for %s above maximum %s", numeric_value, field_name, max_val)
+                return False, numeric_value, f"{field_name} value {numeric_value} above maximum {max_val}"
         
-        return numeric_value
+        return True, numeric_value, None
     
     def format_for_logging(self, timestamp: datetime, device_id: str, data: Dict[str, Any]) -> str:
         """Format processed data for logging.
@@ -179,9 +361,8 @@ class DataProcessor:
         Returns:
             Formatted log string
         """
-        timestamp_str = timestamp.strftime("%Y-%m-%dT%H:%M:%S")
-        data_str = ", ".join([f"{k}:{v}" for k, v in data.items()])
-        return f"[{timestamp_str}] ID:{device_id}, {data_str}"
+        return (f"[{timestamp.isoformat(timespec='seconds')}] ID:{device_id}, "
+                + ", ".join(f"{k}:{v}" for k, v in data.items()))
     
     def get_field_statistics(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate basic statistics for the processed data.
@@ -192,15 +373,12 @@ class DataProcessor:
         Returns:
             Dictionary with basic statistics
         """
-        numeric_fields = {k: v for k, v in data.items() if isinstance(v, (int, float))}
-        
-        if not numeric_fields:
-            return {"numeric_fields": 0}
+        numeric_fields = sum(1 for value in data.values() if isinstance(value, (int, float)))
         
         stats = {
             "total_fields": len(data),
-            "numeric_fields": len(numeric_fields),
-            "field_names": list(data.keys())
+            "numeric_fields": numeric_fields,
+            "field_names": list(data)
         }
         
         return stats
\ No newline at end of file
@@ -1,14 +1,17 @@
 """LoRa radio receiver for weather monitoring system."""
 
 import time
+import asyncio
+import select
 import logging
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List, Tuple
 
 try:
     import board
     import busio
     import digitalio
     import adafruit_rfm9x
+    from .rfm9x import BufferedRFM9x, HEADER_LENGTH, MAX_PACKET_LENGTH
 except ImportError as e:
     logging.warning(f"LoRa hardware libraries not available: {e}")
     # Create mock classes for testing
@@ -16,10 +19,26 @@ except ImportError as e:
     busio = None
     digitalio = None
     adafruit_rfm9x = None
+    BufferedRFM9x = None
+    HEADER_LENGTH = 4
+    MAX_PACKET_LENGTH = 255
+
+try:
+    import RPi.GPIO as GPIO
+except (ImportError, RuntimeError):
+    # Edge interrupts are optional; without them the radio is polled
+    GPIO = None
 
 from ..config.config_manager import ConfigManager
 
 
+# Payload bytes searched for a receive filter; the sensor ID leads the message
+_FILTER_WINDOW = 48
+
+# Radio properties reported by get_radio_status besides the frequency
+_STATUS_PROPERTIES = ("tx_power", "spreading_factor", "rssi", "snr")
+
+
 class LoRaError(Exception):
     """Raised when LoRa operations fail."""
     pass
@@ -37,7 +56,26 @@ class LoRaReceiver:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.rfm9x: Optional[any] = None
+        self._wakeup_fd: Optional[int] = None
+        # Reused for every received packet
+        self._rx_buf = bytearray(MAX_PACKET_LENGTH)
+        # BCM channel wired to DIO0 (RxDone) when interrupts are in use
+        self._dio0_channel: Optional[int] = None
+        self._rx_notify: Optional[Callable[[], None]] = None
+        # (name, property getter) pairs resolved from the radio class
+        self._status_getters: List[Tuple[str, Callable[[Any], Any]]] = []
         self._initialize_radio()
+        self.reload_config()
+    
+    def reload_config(self) -> None:
+        """Snapshot the device settings used on every radio operation.
+        
+        Called once at startup; call again after the configuration changes.
+        """
+        self._device_cfg = dict(self.config.get_device_config())
+        self._handshake_message = self._device_cfg.get('handshake_message', 'Device5')
+        self._handshake_bytes = bytes(self._handshake_message, "ascii")
+        self._default_timeout = float(self._device_cfg.get('message_timeout', 10.0))
     
     def _initialize_radio(self) -> None:
         """Initialize LoRa radio with configuration parameters."""
@@ -60,7 +98,7 @@ class LoRaReceiver:
             reset = digitalio.DigitalInOut(getattr(board, pins_config['reset']))
             
             # Initialize RFM radio
-            self.rfm9x = adafruit_rfm9x.RFM9x(
+            self.rfm9x = BufferedRFM9x(
                 spi, cs, reset, 
                 lora_config['frequency_mhz'],
                 baudrate=lora_config['baudrate']
@@ -70,12 +108,113 @@ class LoRaReceiver:
             self.rfm9x.tx_power = lora_config['tx_power']
             self.rfm9x.spreading_factor = lora_config['spreading_factor']
             
+            self._setup_dio0_interrupt(pins_config.get('dio0'))
+            
+            radio_type = type(self.rfm9x)
+            for name in _STATUS_PROPERTIES:
+                prop = getattr(radio_type, name, None)
+                if isinstance(prop, property):
+                    self._status_getters.append((name, prop.fget))
+            
             self.logger.info("LoRa radio initialized successfully")
             
         except Exception as e:
-            self.logger.error(f"Failed to initialize LoRa radio: {e}")
+            self.logger.error("Failed to initialize LoRa radio: %s", e)
             raise LoRaError(f"LoRa radio initialization failed: {e}")
     
+    def _setup_dio0_interrupt(self, pin_name: Optional[str]) -> None:
+        """Register an RxDone interrupt on the DIO0 pin, if one is configured.
+        
+        Args:
+            pin_name: Board pin name wired to DIO0, or None to poll the radio
+        """
+        if not pin_name:
+            return
+        
+        if GPIO is None:
+            self.logger.warning("DIO0 pin configured but RPi.GPIO is not available; polling the radio")
+            return
+        
+        pin = getattr(board, pin_name, None)
+        if pin is None:
+            self.logger.warning("Unknown DIO0 pin %r in the LoRa configuration; polling the radio", pin_name)
+            return
+        
+        channel = pin.id
+        try:
+            if GPIO.getmode() is None:
+                GPIO.setmode(GPIO.BCM)
+            GPIO.setup(channel, GPIO.IN)
+            GPIO.add_event_detect(channel, GPIO.RISING, callback=self._on_dio0)
+        except (RuntimeError, ValueError) as e:
+            # e.g. no GPIO access, an invalid channel, or edge detection
+            # already claimed on the pin
+            self.logger.warning("Could not register DIO0 interrupt on %s (%s); polling the radio", pin_name, e)
+            return
+        self._dio0_channel = channel
+        self.logger.info("Using DIO0 interrupt on %s for packet reception", pin_name)
+    
+    def _on_dio0(self, channel: int) -> None:
+        """Forward an RxDone interrupt from the GPIO thread to the listener."""
+        notify = self._rx_notify
+        if notify:
+            try:
+                notify()
+            except RuntimeError:
+                # The listener's event loop closed before it unhooked the interrupt
+                pass
+    
+    def close(self) -> None:
+        """Release the DIO0 interrupt, if one was registered."""
+        if self._dio0_channel is not None:
+            GPIO.remove_event_detect(self._dio0_channel)
+            self._dio0_channel = None
+    
+    def set_wakeup_fd(self, fd: Optional[int]) -> None:
+        """Set a file descriptor that becomes readable when listening should stop.
+        
+        The radio is polled over SPI rather than through a file descriptor, so
+        the polling listener checks the descriptor on every poll of the radio
+        instead of selecting on the two together.
+        
+        Args:
+            fd: Read end of a wakeup pipe, or None to disable
+        """
+        self._wakeup_fd = fd
+    
+    def _wakeup_requested(self) -> bool:
+        """Check whether the wakeup descriptor has become readable."""
+        if self._wakeup_fd is None:
+            return False
+        readable, _, _ = select.select([self._wakeup_fd], [], [], 0)
+        return bool(readable)
+    
+    def _receive_packet(self, timeout: float, filter_prefix: Optional[bytes] = None,
+                        stop: Optional[Callable[[], bool]] = None) -> Optional[str]:
+        """Receive one packet into the shared buffer and decode its payload.
+        
+        Args:
+            timeout: Receive timeout in seconds
+            filter_prefix: Bytes that must appear near the start of the payload;
+                other packets are dropped without being decoded
+            stop: Checked while waiting; returning True ends the wait early
+            
+        Returns:
+            Payload text without the RadioHead header, or None if no packet
+            was received or it did not match the filter; the sensor protocol
+            is ASCII
+        """
+        length = self.rfm9x.receive_into(self._rx_buf, timeout=timeout, stop=stop)
+        if length is None:
+            return None
+        
+        if filter_prefix and self._rx_buf.find(
+                filter_prefix, HEADER_LENGTH, min(length, HEADER_LENGTH + _FILTER_WINDOW)) == -1:
+            self.logger.debug("Ignoring packet without %r", filter_prefix)
+            return None
+        
+        return str(memoryview(self._rx_buf)[HEADER_LENGTH:length], "ascii", "replace")
+    
     def send_handshake(self, message: Optional[str] = None) -> bool:
         """Send handshake message to trigger device response.
         
@@ -90,22 +229,26 @@ class LoRaReceiver:
             return False
         
         try:
-            device_config = self.config.get_device_config()
-            handshake_msg = message or device_config.get('handshake_message', 'Device5')
-            
-            self.rfm9x.send(bytes(handshake_msg, "ascii"))
-            self.logger.info(f"Handshake message sent: {handshake_msg}")
+            if message:
+                self.rfm9x.send(bytes(message, "ascii"))
+            else:
+                message = self._handshake_message
+                self.rfm9x.send(self._handshake_bytes)
+            self.logger.info("Handshake message sent: %s", message)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to send handshake message: {e}")
+            self.logger.error("Failed to send handshake message: %s", e)
             return False
     
-    def receive_message(self, timeout: Optional[float] = None) -> Optional[str]:
+    def receive_message(self, timeout: Optional[float] = None,
+                        filter_prefix: Optional[bytes] = None) -> Optional[str]:
         """Receive message from LoRa radio.
         
         Args:
             timeout: Receive timeout in seconds (uses config default if None)
+            filter_prefix: Optional bytes, such as b"ID:Device5", that must
+                appear near the start of the payload for it to be returned
             
         Returns:
             Received message as string, or None if no message received
@@ -115,28 +258,28 @@ class LoRaReceiver:
             return None
         
         try:
-            device_config = self.config.get_device_config()
-            receive_timeout = timeout or device_config.get('message_timeout', 10.0)
+            receive_timeout = timeout or self._default_timeout
             
-            packet = self.rfm9x.receive(timeout=receive_timeout, with_header=True)
+            message = self._receive_packet(receive_timeout, filter_prefix)
             
-            if packet is not None:
-                # Decode to text
-                message = str(packet, "latin-1")
-                self.logger.debug(f"Received raw packet: {message}")
+            if message is not None:
+                self.logger.debug("Received raw packet: %s", message)
                 return message
             else:
                 self.logger.debug("No packet received within timeout")
                 return None
                 
         except Exception as e:
-            self.logger.error(f"Error receiving message: {e}")
+            self.logger.error("Error receiving message: %s", e)
             return None
     
     def listen_for_device(self, device_id: str, timeout: Optional[float] = None, 
                          message_callback: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """Listen for messages from a specific device.
         
+        Waits on the DIO0 interrupt when one is configured, otherwise polls
+        the radio.
+        
         Args:
             device_id: Device ID to listen for
             timeout: Listen timeout in seconds
@@ -145,26 +288,142 @@ class LoRaReceiver:
         Returns:
             Message from specified device, or None if timeout
         """
-        start_time = time.time()
-        device_config = self.config.get_device_config()
-        listen_timeout = timeout or device_config.get('message_timeout', 10.0)
+        if not self.rfm9x:
+            self.logger.error("LoRa radio not initialized")
+            return None
+        
+        if self._dio0_channel is not None:
+            return asyncio.run(self.listen_for_device_async(device_id, timeout, message_callback))
+        return self._poll_for_device(device_id, timeout, message_callback)
+    
+    async def listen_for_device_async(self, device_id: str, timeout: Optional[float] = None,
+                                      message_callback: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Listen for messages from a specific device on the running event loop.
+        
+        With a DIO0 pin configured the radio stays in receive mode and the
+        FIFO is only read after an RxDone interrupt. Without one, the polling
+        listener runs in the loop's default executor.
+        
+        Args:
+            device_id: Device ID to listen for
+            timeout: Listen timeout in seconds
+            message_callback: Optional callback function for received messages
+            
+        Returns:
+            Message from specified device, or None if timeout
+        """
+        if not self.rfm9x:
+            self.logger.error("LoRa radio not initialized")
+            return None
+        
+        loop = asyncio.get_running_loop()
+        if self._dio0_channel is None:
+            return await loop.run_in_executor(
+                None, self._poll_for_device, device_id, timeout, message_callback
+            )
+        
+        listen_timeout = timeout or self._default_timeout
+        deadline = loop.time() + listen_timeout
+        id_filter = self._id_filter(device_id)
+        rx_done = asyncio.Event()
         
-        self.logger.info(f"Listening for messages from {device_id}")
+        self._rx_notify = lambda: loop.call_soon_threadsafe(rx_done.set)
+        if self._wakeup_fd is not None:
+            loop.add_reader(self._wakeup_fd, rx_done.set)
         
-        while time.time() - start_time < listen_timeout:
-            message = self.receive_message(timeout=1.0)  # Short timeout for responsive checking
+        self.logger.info("Listening for messages from %s", device_id)
+        
+        try:
+            self.rfm9x.listen()
+            # A packet may have completed before the interrupt was hooked up
+            if self.rfm9x.rx_done():
+                rx_done.set()
             
-            if message and device_id in message:
-                self.logger.info(f"Received message from {device_id}: {message}")
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                
+                try:
+                    await asyncio.wait_for(rx_done.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                rx_done.clear()
                 
-                if message_callback:
-                    message_callback(message)
+                if self._wakeup_requested():
+                    self.logger.info("Stopped listening for %s: wakeup requested", device_id)
+                    return None
                 
+                try:
+                    # The packet is already in the FIFO; read it without waiting
+                    message = self._receive_packet(0, id_filter)
+                except Exception as e:
+                    self.logger.error("Error receiving message: %s", e)
+                    return None
+                
+                if message is not None:
+                    self._deliver_message(device_id, message, message_callback)
+                    return message
+        finally:
+            self._rx_notify = None
+            if self._wakeup_fd is not None:
+                loop.remove_reader(self._wakeup_fd)
+        
+        self.logger.info("No message received from %s within timeout", device_id)
+        return None
+    
+    def _poll_for_device(self, device_id: str, timeout: Optional[float],
+                         message_callback: Optional[Callable[[str], None]]) -> Optional[str]:
+        """Listen for a device by polling the radio for the whole timeout."""
+        listen_timeout = timeout or self._default_timeout
+        deadline = time.monotonic() + listen_timeout
+        id_filter = self._id_filter(device_id)
+        remaining = listen_timeout
+        stop = self._wakeup_requested if self._wakeup_fd is not None else None
+        
+        self.logger.info("Listening for messages from %s", device_id)
+        
+        # One receive window for the whole remaining timeout; only packets
+        # dropped by the device filter restart it, and a wakeup ends it
+        while remaining > 0:
+            if self._wakeup_requested():
+                self.logger.info("Stopped listening for %s: wakeup requested", device_id)
+                return None
+            
+            try:
+                message = self._receive_packet(remaining, id_filter, stop)
+            except Exception as e:
+                self.logger.error("Error receiving message: %s", e)
+                return None
+            
+            if message is not None:
+                self._deliver_message(device_id, message, message_callback)
                 return message
+            
+            remaining = deadline - time.monotonic()
         
-        self.logger.info(f"No message received from {device_id} within timeout")
+        self.logger.info("No message received from %s within timeout", device_id)
         return None
     
+    @staticmethod
+    def _id_filter(device_id: str) -> bytes:
+        """Build the receive filter matching a device's "ID:<device>" field."""
+        return b"ID:" + device_id.encode("ascii")
+    
+    def _deliver_message(self, device_id: str, message: str,
+                         message_callback: Optional[Callable[[str], None]]) -> None:
+        """Log a message from the device being listened for and pass it on.
+        
+        Args:
+            device_id: Device ID listened for
+            message: Decoded packet payload
+            message_callback: Optional callback invoked with the message
+        """
+        self.logger.info("Received message from %s: %s", device_id, message)
+        
+        if message_callback:
+            message_callback(message)
+    
     def get_radio_status(self) -> Dict[str, Any]:
         """Get current radio status information.
         
@@ -178,17 +437,16 @@ class LoRaReceiver:
             # Get available radio properties
             status = {
                 "status": "initialized",
-                "frequency_mhz": self.rfm9x.frequency_mhz,
-                "tx_power": getattr(self.rfm9x, 'tx_power', 'unknown'),
-                "spreading_factor": getattr(self.rfm9x, 'spreading_factor', 'unknown'),
-                "rssi": getattr(self.rfm9x, 'rssi', 'unknown'),
-                "snr": getattr(self.rfm9x, 'snr', 'unknown')
+                "frequency_mhz": self.rfm9x.frequency_mhz
             }
+            status.update(dict.fromkeys(_STATUS_PROPERTIES, 'unknown'))
+            for name, getter in self._status_getters:
+                status[name] = getter(self.rfm9x)
             
             return status
             
         except Exception as e:
-            self.logger.error(f"Error getting radio status: {e}")
+            self.logger.error("Error getting radio status: %s", e)
             return {"status": "error", "message": str(e)}
     
     def test_radio(self) -> bool:
@@ -206,5 +464,5 @@ class LoRaReceiver:
             return status.get("status") == "initialized"
             
         except Exception as e:
-            self.logger.error(f"Radio test failed: {e}")
+            self.logger.error("Radio test failed: %s", e)
             return False
\ No newline at end of file
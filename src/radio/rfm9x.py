@@ -0,0 +1,109 @@
+"""RFM9x driver extensions for the weather monitoring receiver."""
+
+import time
+from typing import Callable, Optional
+
+import adafruit_rfm9x
+
+
+# SX127x LoRa register addresses (datasheet section 6.4)
+_REG_00_FIFO = 0x00
+_REG_0D_FIFO_ADDR_PTR = 0x0D
+_REG_10_FIFO_RX_CURRENT_ADDR = 0x10
+_REG_12_IRQ_FLAGS = 0x12
+_REG_13_RX_NB_BYTES = 0x13
+
+# RadioHead header length (To, From, ID, Flags) and broadcast address
+HEADER_LENGTH = 4
+_BROADCAST_ADDRESS = 0xFF
+
+# Largest packet the FIFO can report in RegRxNbBytes
+MAX_PACKET_LENGTH = 255
+
+
+class BufferedRFM9x(adafruit_rfm9x.RFM9x):
+    """RFM9x radio that receives packets into a caller-supplied buffer."""
+    
+    def __init__(self, *args, **kwargs) -> None:
+        """Initialize the radio; arguments are passed to RFM9x."""
+        # Register reads are full-duplex transfers of the address byte followed
+        # by the payload; allocated before RFM9x.__init__ starts reading registers
+        self._xfer_out = bytearray(MAX_PACKET_LENGTH + 1)
+        self._xfer_in = bytearray(MAX_PACKET_LENGTH + 1)
+        super().__init__(*args, **kwargs)
+    
+    def _read_into(self, address: int, buf: bytearray, length: Optional[int] = None) -> None:
+        """Read registers starting at an address in a single SPI transfer.
+        
+        RFM9x sends the address byte and reads the payload as two transfers;
+        here both are clocked by one write_readinto call.
+        
+        Args:
+            address: Register address to read from
+            buf: Buffer receiving the register values
+            length: Number of bytes to read (defaults to len(buf))
+        """
+        if length is None:
+            length = len(buf)
+        end = length + 1
+        
+        self._xfer_out[0] = address & 0x7F
+        with self._device as device:
+            device.write_readinto(self._xfer_out, self._xfer_in, out_end=end, in_end=end)
+        buf[:length] = memoryview(self._xfer_in)[1:end]
+    
+    def receive_into(self, buf: bytearray, *, keep_listening: bool = True,
+                     timeout: Optional[float] = None,
+                     stop: Optional[Callable[[], bool]] = None) -> Optional[int]:
+        """Wait for a packet and read it, header included, into a buffer.
+        
+        Mirrors RFM9x.receive(with_header=True) without allocating a new
+        bytearray per packet. Packets failing the CRC check, too short for
+        the RadioHead header, or addressed to another node are dropped.
+        
+        Args:
+            buf: Buffer of at least MAX_PACKET_LENGTH bytes
+            keep_listening: Return to receive mode after reading the packet
+            timeout: Receive timeout in seconds (uses receive_timeout if None)
+            stop: Checked while waiting; returning True ends the wait early
+        
+        Returns:
+            Number of bytes read into buf, or None if no packet was received
+        """
+        if timeout is None:
+            timeout = self.receive_timeout
+        if timeout is not None:
+            self.listen()
+            start = time.monotonic()
+            while not self.rx_done():
+                if time.monotonic() - start >= timeout or (stop is not None and stop()):
+                    if not self.rx_done():
+                        if not keep_listening:
+                            self.idle()
+                        return None
+                    break
+        
+        length = None
+        self.last_rssi = self.rssi
+        self.last_snr = self.snr
+        self.idle()
+        
+        if self.enable_crc and self.crc_error():
+            self.crc_error_count += 1
+        else:
+            fifo_length = self._read_u8(_REG_13_RX_NB_BYTES)
+            if fifo_length > 0:
+                current_addr = self._read_u8(_REG_10_FIFO_RX_CURRENT_ADDR)
+                self._write_u8(_REG_0D_FIFO_ADDR_PTR, current_addr)
+                self._read_into(_REG_00_FIFO, buf, length=fifo_length)
+            
+            if fifo_length > HEADER_LENGTH and (
+                self.node == _BROADCAST_ADDRESS
+                or buf[0] in (_BROADCAST_ADDRESS, self.node)
+            ):
+                length = fifo_length
+        
+        if keep_listening:
+            self.listen()
+        self._write_u8(_REG_12_IRQ_FLAGS, 0xFF)
+        return length
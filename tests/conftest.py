@@ -0,0 +1,23 @@
+"""Shared test fixtures."""
+
+import pytest
+import yaml
+
+from src.config.config_manager import ConfigManager
+
+
+BASE_CONFIG = {
+    'lora': {'frequency_mhz': 868.0, 'tx_power': 23},
+    'influxdb': {'token': 'test_token', 'url': 'http://localhost:8086'},
+    'device': {'id': 'Device5', 'handshake_message': 'Device5'},
+    'logging': {'level': 'INFO'},
+    'storage': {'log_base_dir': '/tmp/logs'}
+}
+
+
+@pytest.fixture(scope='session')
+def base_config(tmp_path_factory):
+    """Load one ConfigManager from BASE_CONFIG for read-only tests."""
+    config_path = tmp_path_factory.mktemp('config') / 'config.yaml'
+    config_path.write_text(yaml.dump(BASE_CONFIG))
+    return ConfigManager(str(config_path))
@@ -12,26 +12,10 @@ from src.config.config_manager import ConfigManager
 class TestConfigManager:
     """Test cases for ConfigManager."""
     
-    def test_load_config_success(self):
+    def test_load_config_success(self, base_config):
         """Test successful configuration loading."""
-        config_data = {
-            'lora': {'frequency_mhz': 868.0},
-            'influxdb': {'token': 'test_token'},
-            'device': {'id': 'Device5'},
-            'logging': {'level': 'INFO'},
-            'storage': {'log_base_dir': '/tmp/logs'}
-        }
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            config_path = f.name
-        
-        try:
-            config = ConfigManager(config_path)
-            assert config.get('lora.frequency_mhz') == 868.0
-            assert config.get('device.id') == 'Device5'
-        finally:
-            os.unlink(config_path)
+        assert base_config.get('lora.frequency_mhz') == 868.0
+        assert base_config.get('device.id') == 'Device5'
     
     def test_config_file_not_found(self):
         """Test handling of missing configuration file."""
@@ -59,26 +43,10 @@ class TestConfigManager:
         finally:
             os.unlink(config_path)
     
-    def test_get_with_default(self):
+    def test_get_with_default(self, base_config):
         """Test getting configuration with default values."""
-        config_data = {
-            'lora': {'frequency_mhz': 868.0},
-            'influxdb': {'token': 'test_token'},
-            'device': {'id': 'Device5'},
-            'logging': {'level': 'INFO'},
-            'storage': {'log_base_dir': '/tmp/logs'}
-        }
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            config_path = f.name
-        
-        try:
-            config = ConfigManager(config_path)
-            assert config.get('nonexistent.key', 'default') == 'default'
-            assert config.get('lora.nonexistent', 123) == 123
-        finally:
-            os.unlink(config_path)
+        assert base_config.get('nonexistent.key', 'default') == 'default'
+        assert base_config.get('lora.nonexistent', 123) == 123
     
     def test_validation_missing_influxdb_token(self):
         """Test validation when InfluxDB token is missing."""
@@ -100,33 +68,23 @@ class TestConfigManager:
         finally:
             os.unlink(config_path)
     
-    def test_get_specific_configs(self):
+    def test_get_specific_configs(self, base_config):
         """Test getting specific configuration sections."""
-        config_data = {
-            'lora': {'frequency_mhz': 868.0, 'tx_power': 23},
-            'influxdb': {'token': 'test_token', 'url': 'http://localhost:8086'},
-            'device': {'id': 'Device5', 'handshake_message': 'Device5'},
-            'logging': {'level': 'INFO'},
-            'storage': {'log_base_dir': '/tmp/logs'}
-        }
+        lora_config = base_config.get_lora_config()
+        assert lora_config['frequency_mhz'] == 868.0
+        assert lora_config['tx_power'] == 23
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            config_path = f.name
+        influxdb_config = base_config.get_influxdb_config()
+        assert influxdb_config['token'] == 'test_token'
+        assert influxdb_config['url'] == 'http://localhost:8086'
         
-        try:
-            config = ConfigManager(config_path)
-            
-            lora_config = config.get_lora_config()
-            assert lora_config['frequency_mhz'] == 868.0
-            assert lora_config['tx_power'] == 23
-            
-            influxdb_config = config.get_influxdb_config()
-            assert influxdb_config['token'] == 'test_token'
-            assert influxdb_config['url'] == 'http://localhost:8086'
-            
-            device_config = config.get_device_config()
-            assert device_config['id'] == 'Device5'
-            
-        finally:
-            os.unlink(config_path)
\ No newline at end of file
+        device_config = base_config.get_device_config()
+        assert device_config['id'] == 'Device5'
+    
+    def test_section_configs_are_read_only_views(self, base_config):
+        """Test section getters return cached read-only views."""
+        device_config = base_config.get_device_config()
+        assert device_config is base_config.get_device_config()
+        
+        with pytest.raises(TypeError):
+            device_config['id'] = 'Device6'
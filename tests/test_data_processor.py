@@ -1,5 +1,6 @@
 """Tests for data processor."""
 
+import time
 import pytest
 from datetime import datetime
 from unittest.mock import Mock, patch
@@ -45,6 +46,7 @@ class TestDataProcessor:
         timestamp, processed_data = data_processor.process_message(message, device_id)
         
         assert isinstance(timestamp, datetime)
+        assert timestamp.tzinfo is not None
         assert 'maxAcceleration_m/s2' in processed_data
         assert 'rmsAcceleration_m/s2' in processed_data
         assert 'temperature_C' in processed_data
@@ -54,6 +56,17 @@ class TestDataProcessor:
         assert processed_data['maxAcceleration_m/s2'] == 2.5
         assert processed_data['temperature_C'] == 25.5
     
+    def test_process_message_ns(self, data_processor):
+        """Test the nanosecond variant returns an epoch timestamp and the same data."""
+        message = "ID:Device5, Max_A:2.50, Temp:25.5"
+        before = time.time_ns()
+        
+        timestamp_ns, processed_data = data_processor.process_message_ns(message, "Device5")
+        
+        assert isinstance(timestamp_ns, int)
+        assert before <= timestamp_ns <= time.time_ns()
+        assert processed_data == data_processor.process_message(message, "Device5")[1]
+    
     def test_process_message_invalid_device_id(self, data_processor):
         """Test processing message with wrong device ID."""
         message = "ID:Device4, Max_A:2.50, Temp:25.5"
@@ -62,6 +75,22 @@ class TestDataProcessor:
         with pytest.raises(DataValidationError, match="Invalid message format or device ID mismatch"):
             data_processor.process_message(message, device_id)
     
+    def test_process_message_device_id_prefix_only(self, data_processor):
+        """Test that a device ID sharing a prefix is not accepted."""
+        message = "ID:Device50, Max_A:2.50, Temp:25.5"
+        device_id = "Device5"
+        
+        with pytest.raises(DataValidationError, match="Invalid message format or device ID mismatch"):
+            data_processor.process_message(message, device_id)
+    
+    def test_process_message_out_of_range(self, data_processor):
+        """Test a mapped field outside its category range rejects the message."""
+        message = "ID:Device5, Max_A:2.50, Temp:99.0, Status:OK"
+        device_id = "Device5"
+        
+        with pytest.raises(DataValidationError, match="temperature_C value .* above maximum"):
+            data_processor.process_message(message, device_id)
+    
     def test_process_message_empty_message(self, data_processor):
         """Test processing empty message."""
         message = ""
@@ -78,6 +107,59 @@ class TestDataProcessor:
         with pytest.raises(DataValidationError):
             data_processor.process_message(message, device_id)
     
+    def test_process_batch_columns(self, data_processor):
+        """Test batch processing builds one float32 column per field."""
+        np = pytest.importorskip("numpy")
+        messages = [
+            "ID:Device5, Max_A:2.50, Temp:25.5",
+            "ID:Device5, Temp:26.0, Status:OK",
+        ]
+        
+        columns = data_processor.process_batch(messages, "Device5")
+        
+        assert set(columns) == {'maxAcceleration_m/s2', 'temperature_C'}
+        assert columns['temperature_C'].dtype == np.float32
+        assert columns['temperature_C'].tolist() == [25.5, 26.0]
+        assert np.isnan(columns['maxAcceleration_m/s2'][1])
+    
+    def test_process_batch_out_of_range(self, data_processor):
+        """Test batch processing rejects the batch on an out-of-range value."""
+        pytest.importorskip("numpy")
+        messages = ["ID:Device5, Temp:25.5", "ID:Device5, Temp:-50.0"]
+        
+        with pytest.raises(DataValidationError, match="temperature_C value .* below minimum .* message 1"):
+            data_processor.process_batch(messages, "Device5")
+    
+    def test_process_batch_checks_range_before_float32(self, data_processor):
+        """Test values just past a limit are rejected even if float32 rounds them onto it."""
+        pytest.importorskip("numpy")
+        messages = ["ID:Device5, Temp:85.000001"]
+        
+        with pytest.raises(DataValidationError, match="temperature_C value .* above maximum"):
+            data_processor.process_batch(messages, "Device5")
+    
+    def test_process_batch_message_without_fields(self, data_processor):
+        """Test batch processing rejects a message with no data fields."""
+        pytest.importorskip("numpy")
+        messages = ["ID:Device5, Temp:25.5", "ID:Device5,"]
+        
+        with pytest.raises(DataValidationError, match="Message 1 contains no data fields"):
+            data_processor.process_batch(messages, "Device5")
+    
+    def test_process_batch_parses_like_process_message(self, data_processor):
+        """Test batch and single-message processing agree on what is numeric."""
+        pytest.importorskip("numpy")
+        # float() accepts non-ASCII digits, but no conversion path treats them as numeric
+        message = "ID:Device5, Temp:25.5, Status:\u0663"
+        
+        _, data = data_processor.process_message_ns(message, "Device5")
+        columns = data_processor.process_batch([message], "Device5")
+        
+        assert data == {'temperature_C': 25.5, 'Status': '\u0663'}
+        assert set(columns) == {'temperature_C'}
+        with pytest.raises(DataValidationError, match="temperature_C value .* is not numeric"):
+            data_processor.process_batch(["ID:Device5, Temp:\u0663"], "Device5")
+    
     def test_validate_field_value_temperature_ok(self, data_processor):
         """Test valid temperature validation."""
         result = data_processor._validate_field_value('temperature_C', '25.5')
@@ -93,11 +175,50 @@ class TestDataProcessor:
         with pytest.raises(DataValidationError, match="temperature_C value .* above maximum"):
             data_processor._validate_field_value('temperature_C', '100.0')
     
+    def test_validation_category_resolves_to_mapped_fields(self, data_processor):
+        """Test category ranges apply to every mapped field in that category."""
+        assert data_processor._field_spec['pressure_hPa'] == (300.0, 1100.0)
+        assert data_processor._field_spec['maxAcceleration_m/s2'] == (0.0, 100.0)
+        assert data_processor._field_spec['rmsAcceleration_m/s2'] == (0.0, 100.0)
+        
+        with pytest.raises(DataValidationError, match="pressure_hPa value .* above maximum"):
+            data_processor._validate_field_value('pressure_hPa', '1200.0')
+    
+    def test_field_converters_match_generic_validation(self, data_processor):
+        """Test the per-field converters agree with _validate_field_value."""
+        name, converter = data_processor._raw_converters['Temp']
+        
+        assert name == 'temperature_C'
+        assert converter('85.0') == data_processor._validate_field_value(name, '85.0')
+        for value in ('85.1', '-40.5', 'warm'):
+            with pytest.raises(DataValidationError) as converted:
+                converter(value)
+            with pytest.raises(DataValidationError) as generic:
+                data_processor._validate_field_value(name, value)
+            assert str(converted.value) == str(generic.value)
+    
+    def test_check_field_value_reports_without_raising(self, data_processor):
+        """Test the non-raising check returns status, value and error message."""
+        value_range = (-40.0, 85.0)
+        
+        assert data_processor._check_field_value('temperature_C', '25.5', value_range) == (True, 25.5, None)
+        assert data_processor._check_field_value('Status', 'OK', None) == (True, 'OK', None)
+        
+        ok, value, error = data_processor._check_field_value('temperature_C', '100.0', value_range)
+        assert not ok
+        assert value == 100.0
+        assert error == "temperature_C value 100.0 above maximum 85.0"
+    
     def test_validate_field_value_non_numeric(self, data_processor):
         """Test validation of non-numeric field."""
         result = data_processor._validate_field_value('unknown_field', 'string_value')
         assert result == 'string_value'
     
+    def test_validate_field_value_range_field_not_numeric(self, data_processor):
+        """Test that a field with a configured range must be numeric."""
+        with pytest.raises(DataValidationError, match="pressure value .* is not numeric"):
+            data_processor._validate_field_value('pressure', 'n/a')
+    
     def test_format_for_logging(self, data_processor):
         """Test formatting data for logging."""
         timestamp = datetime(2024, 1, 15, 10, 30, 45)
@@ -145,23 +266,41 @@ class TestDataProcessor:
     
     def test_extract_data_fields(self, data_processor):
         """Test extracting data fields from message."""
-        message = "Max_A:2.50, RMS_A:1.80, Temp:25.5"
+        message = "ID:Device5, Max_A:2.50, RMS_A:1.80, Temp:25.5"
+        
+        _, data = data_processor.process_message_ns(message, "Device5")
+        
+        assert data == {'maxAcceleration_m/s2': 2.5, 'rmsAcceleration_m/s2': 1.8, 'temperature_C': 25.5}
+    
+    def test_extract_data_fields_strips_whitespace(self, data_processor):
+        """Test whitespace around field names and values is ignored."""
+        message = "ID:Device5, Max_A : 2.50 ,Status: OK "
+        
+        _, data = data_processor.process_message_ns(message, "Device5")
         
-        data = data_processor._extract_data_fields(message)
+        assert data == {'maxAcceleration_m/s2': 2.5, 'Status': 'OK'}
+    
+    def test_field_tokens_are_kept_whole(self, data_processor):
+        """Test unusual field names are kept as written rather than truncated."""
+        message = "ID:Device5, Max-A:2.5, Wind Speed:3.0, 1x:5, junk, :7, Time:12:30"
+        
+        _, data = data_processor.process_message_ns(message, "Device5")
         
-        assert data['Max_A'] == '2.50'
-        assert data['RMS_A'] == '1.80'
-        assert data['Temp'] == '25.5'
+        assert data == {'Max-A': 2.5, 'Wind Speed': 3.0, '1x': 5.0, 'Time': '12:30'}
+    
+    def test_empty_field_value(self, data_processor):
+        """Test an empty value is kept for unvalidated fields and rejected for ranged ones."""
+        _, data = data_processor.process_message_ns("ID:Device5, Status:, Max_A:2.5", "Device5")
+        assert data == {'Status': '', 'maxAcceleration_m/s2': 2.5}
+        
+        with pytest.raises(DataValidationError, match="temperature_C value '' is not numeric"):
+            data_processor.process_message_ns("ID:Device5, Temp:", "Device5")
     
     def test_validate_and_transform_data(self, data_processor):
         """Test data validation and transformation."""
-        raw_data = {
-            'Max_A': '2.50',
-            'Temp': '25.5',
-            'Status': 'OK'
-        }
+        message = "ID:Device5, Max_A:2.50, Temp:25.5, Status:OK"
         
-        processed = data_processor._validate_and_transform_data(raw_data)
+        _, processed = data_processor.process_message_ns(message, "Device5")
         
         assert 'maxAcceleration_m/s2' in processed
         assert 'temperature_C' in processed
@@ -0,0 +1,67 @@
+"""Tests for InfluxDB manager."""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from src.database.influxdb_client import InfluxDBManager
+from src.config.config_manager import ConfigManager
+
+
+class TestInfluxDBManager:
+    """Test cases for InfluxDBManager."""
+    
+    @pytest.fixture
+    def manager(self):
+        """Create an InfluxDBManager without connecting to InfluxDB."""
+        config = Mock(spec=ConfigManager)
+        config.get_influxdb_config.return_value = {'bucket': 'LoRa_Atmosphere', 'org': 'org_name'}
+        config.get_device_config.return_value = {'id': 'Device5'}
+        config.get_retry_config.return_value = {}
+        
+        with patch.object(InfluxDBManager, '_initialize_client'):
+            return InfluxDBManager(config)
+    
+    def test_build_line(self, manager):
+        """Test building a line protocol record."""
+        timestamp = datetime(2024, 1, 15, 10, 30, 45, tzinfo=timezone.utc)
+        
+        line = manager.build_line(timestamp, 'Device5', {'temperature_C': 25.5, 'humidity_%': 65})
+        
+        assert line == 'sensor_data,device=Device5 temperature_C=25.5,humidity_%=65.0 1705314645'
+    
+    def test_build_line_timestamp_ns_matches_datetime(self, manager):
+        """Test int nanosecond timestamps are written at seconds precision."""
+        timestamp = datetime(2024, 1, 15, 10, 30, 45, tzinfo=timezone.utc)
+        data = {'temperature_C': 25.5}
+        
+        from_ns = manager.build_line(1705314645_999999999, 'Device5', data)
+        
+        assert from_ns == manager.build_line(timestamp, 'Device5', data)
+        assert from_ns.endswith(' 1705314645')
+    
+    def test_build_line_naive_datetime_is_utc(self, manager):
+        """Test naive timestamps are treated as UTC."""
+        line = manager.build_line(datetime(2024, 1, 15, 10, 30, 45), 'Device5', {'a': 1.0})
+        
+        assert line.endswith(' 1705314645')
+    
+    def test_build_line_escapes_tags_and_keys(self, manager):
+        """Test tag values and field keys are escaped like the InfluxDB client."""
+        line = manager.build_line(0, 'Dev ice,5', {'wind speed=\tmax\r\n': 1.0})
+        
+        assert line == r'sensor_data,device=Dev\ ice\,5 wind\ speed\=\tmax\r\n=1.0 0'
+    
+    def test_build_line_quotes_string_values(self, manager):
+        """Test string values are quoted, escaped and kept on one line."""
+        line = manager.build_line(0, 'Device5', {'Status': 'a\nb "c" \\d\x01'})
+        
+        assert line == r'sensor_data,device=Device5 Status="a\nb \"c\" \\d\x01" 0'
+        assert '\n' not in line
+    
+    def test_build_line_drops_non_finite_values(self, manager):
+        """Test NaN and infinity are dropped, leaving None when nothing remains."""
+        line = manager.build_line(0, 'Device5', {'a': float('nan'), 'b': float('inf'), 'c': 2.0})
+        
+        assert line == 'sensor_data,device=Device5 c=2.0 0'
+        assert manager.build_line(0, 'Device5', {'a': float('nan')}) is None
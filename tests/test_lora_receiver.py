@@ -0,0 +1,331 @@
+"""Tests for LoRa receiver."""
+
+import asyncio
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+import pytest
+from unittest.mock import Mock
+
+from src.config.config_manager import ConfigManager
+
+
+class FakeSPIDevice:
+    """SPI device returning the radio's FIFO contents from write_readinto."""
+    
+    def __init__(self, radio):
+        self.radio = radio
+        self.addresses = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def write_readinto(self, out_buf, in_buf, out_start=0, out_end=None, in_start=0, in_end=None):
+        self.addresses.append(out_buf[0])
+        payload = self.radio.fifo[self.radio.fifo_ptr:]
+        # The first byte is clocked in while the address byte is sent
+        in_buf[0] = 0xAA
+        count = min(in_end - 1, len(payload))
+        in_buf[1:1 + count] = payload[:count]
+
+
+class FakeRFM9x:
+    """Register-level stand-in for adafruit_rfm9x.RFM9x.
+    
+    Queued packets are (bytes, crc_ok) pairs; the first one is in the FIFO
+    and clearing the IRQ flags consumes it.
+    """
+    
+    def __init__(self, spi, cs, reset, frequency, *, baudrate=5000000):
+        self._device = FakeSPIDevice(self)
+        self.frequency_mhz = frequency
+        self.packets = []
+        self.node = 0xFF
+        self.enable_crc = True
+        self.crc_error_count = 0
+        self.receive_timeout = 0.5
+        self.rssi = -40
+        self.snr = 9.5
+        self.listen_calls = 0
+        self.fifo_ptr = 0
+    
+    @property
+    def fifo(self):
+        return self.packets[0][0] if self.packets else b''
+    
+    def listen(self):
+        self.listen_calls += 1
+    
+    def idle(self):
+        pass
+    
+    def rx_done(self):
+        return bool(self.packets)
+    
+    def crc_error(self):
+        return bool(self.packets) and not self.packets[0][1]
+    
+    def _read_u8(self, address):
+        if address == 0x13:
+            return len(self.fifo)
+        return 0
+    
+    def _write_u8(self, address, value):
+        if address == 0x0D:
+            self.fifo_ptr = value
+        elif address == 0x12 and self.packets:
+            self.packets.pop(0)
+
+
+class FakeGPIO:
+    """Stand-in for RPi.GPIO recording edge-detect callbacks."""
+    
+    BCM = 11
+    IN = 1
+    RISING = 31
+    
+    def __init__(self, setup_error=None, detect_error=None):
+        self.mode = None
+        self.callbacks = {}
+        self.setup_error = setup_error
+        self.detect_error = detect_error
+    
+    def getmode(self):
+        return self.mode
+    
+    def setmode(self, mode):
+        self.mode = mode
+    
+    def setup(self, channel, direction):
+        if self.setup_error:
+            raise self.setup_error
+    
+    def add_event_detect(self, channel, edge, callback):
+        if self.detect_error:
+            raise self.detect_error
+        self.callbacks[channel] = callback
+    
+    def remove_event_detect(self, channel):
+        del self.callbacks[channel]
+
+
+def _packet(payload, to=0xFF):
+    """Build a RadioHead packet: To, From, ID and Flags, then the payload."""
+    return bytes([to, 0x01, 0x00, 0x00]) + payload
+
+
+@pytest.fixture
+def radio_modules(monkeypatch):
+    """Import the radio modules against stub hardware libraries."""
+    board = types.ModuleType('board')
+    for channel, name in enumerate(['SCK', 'MOSI', 'MISO', 'CE1', 'D25', 'D22']):
+        setattr(board, name, types.SimpleNamespace(id=channel))
+    busio = types.ModuleType('busio')
+    busio.SPI = lambda *args, **kwargs: object()
+    digitalio = types.ModuleType('digitalio')
+    digitalio.DigitalInOut = lambda pin: pin
+    adafruit_rfm9x = types.ModuleType('adafruit_rfm9x')
+    adafruit_rfm9x.RFM9x = FakeRFM9x
+    
+    for name, module in [('board', board), ('busio', busio), ('digitalio', digitalio),
+                         ('adafruit_rfm9x', adafruit_rfm9x)]:
+        monkeypatch.setitem(sys.modules, name, module)
+    radio_names = ('src.radio', 'src.radio.rfm9x', 'src.radio.lora_receiver')
+    for name in radio_names:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    
+    yield importlib.import_module('src.radio.lora_receiver')
+    
+    # Later imports get the modules built against the real libraries again
+    for name in radio_names:
+        sys.modules.pop(name, None)
+
+
+@pytest.fixture
+def gpio(radio_modules, monkeypatch):
+    """Replace RPi.GPIO in the receiver module with a fake."""
+    fake = FakeGPIO()
+    monkeypatch.setattr(radio_modules, 'GPIO', fake)
+    return fake
+
+
+def _fire_later(*steps):
+    """Run (delay, action) steps on another thread, like GPIO callbacks."""
+    def run():
+        for delay, action in steps:
+            time.sleep(delay)
+            action()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def make_receiver(radio_modules):
+    """Build LoRaReceivers on the stub radio."""
+    def make(**pins):
+        config = Mock(spec=ConfigManager)
+        config.get_lora_config.return_value = {
+            'frequency_mhz': 868.0, 'baudrate': 100000, 'tx_power': 23, 'spreading_factor': 8,
+            'pins': {'cs': 'CE1', 'reset': 'D25', 'sck': 'SCK', 'mosi': 'MOSI', 'miso': 'MISO', **pins},
+        }
+        config.get_device_config.return_value = {'id': 'Device5', 'message_timeout': 0.05}
+        return radio_modules.LoRaReceiver(config)
+    return make
+
+
+class TestLoRaReceiver:
+    """Test cases for LoRaReceiver on a stub radio."""
+    
+    def test_receive_strips_header(self, make_receiver):
+        """Test the RadioHead header is stripped and the payload decoded."""
+        receiver = make_receiver()
+        receiver.rfm9x.packets.append((_packet(b'ID:Device5, Temp:25.5'), True))
+        
+        assert receiver.receive_message(timeout=0.05) == 'ID:Device5, Temp:25.5'
+        assert receiver.rfm9x.packets == []
+    
+    def test_packet_from_other_device_is_dropped(self, make_receiver):
+        """Test a packet from another device is dropped and listening restarts."""
+        receiver = make_receiver()
+        receiver.rfm9x.packets += [(_packet(b'ID:Device7, Temp:1.0'), True),
+                                   (_packet(b'ID:Device5, Temp:25.5'), True)]
+        received = []
+        
+        message = receiver.listen_for_device('Device5', timeout=0.5, message_callback=received.append)
+        
+        assert message == 'ID:Device5, Temp:25.5'
+        assert received == [message]
+        assert receiver.rfm9x.listen_calls >= 2
+    
+    def test_receive_timeout(self, make_receiver):
+        """Test receiving returns None when no packet arrives."""
+        receiver = make_receiver()
+        
+        assert receiver.receive_message(timeout=0.05) is None
+        assert receiver.listen_for_device('Device5', timeout=0.05) is None
+    
+    def test_crc_error_is_counted_and_dropped(self, make_receiver):
+        """Test a packet failing the CRC check is counted and not returned."""
+        receiver = make_receiver()
+        receiver.rfm9x.packets.append((_packet(b'ID:Device5, Temp:25.5'), False))
+        
+        assert receiver.receive_message(timeout=0.05) is None
+        assert receiver.rfm9x.crc_error_count == 1
+        assert receiver.rfm9x.packets == []
+    
+    def test_packet_for_other_node_or_too_short_is_dropped(self, make_receiver):
+        """Test packets addressed to another node or without a payload are dropped."""
+        receiver = make_receiver()
+        receiver.rfm9x.node = 0x02
+        receiver.rfm9x.packets += [(_packet(b'ID:Device5, Temp:25.5', to=0x03), True),
+                                   (bytes([0xFF, 0x01, 0x00, 0x00]), True)]
+        
+        assert receiver.receive_message(timeout=0.05) is None
+        assert receiver.receive_message(timeout=0.05) is None
+        
+        receiver.rfm9x.packets.append((_packet(b'ID:Device5, Temp:25.5', to=0x02), True))
+        assert receiver.receive_message(timeout=0.05) == 'ID:Device5, Temp:25.5'
+    
+    def test_read_into_skips_address_byte(self, make_receiver):
+        """Test _read_into returns the register data without the address byte."""
+        receiver = make_receiver()
+        radio = receiver.rfm9x
+        radio.packets.append((b'\x01\x02\x03\x04\x05\x06', True))
+        buf = bytearray(8)
+        
+        radio._read_into(0x80, buf, length=5)
+        
+        assert radio._device.addresses[-1] == 0x00
+        assert bytes(buf) == b'\x01\x02\x03\x04\x05\x00\x00\x00'
+    
+    
+    def test_polling_wakeup_fd_ends_wait(self, make_receiver):
+        """Test the wakeup descriptor ends a polling receive window early."""
+        receiver = make_receiver()
+        wakeup_r, wakeup_w = os.pipe()
+        receiver.set_wakeup_fd(wakeup_r)
+        
+        try:
+            thread = _fire_later((0.05, lambda: os.write(wakeup_w, b'\0')))
+            start = time.monotonic()
+            assert receiver.listen_for_device('Device5', timeout=5) is None
+            thread.join()
+            assert time.monotonic() - start < 2
+        finally:
+            os.close(wakeup_r)
+            os.close(wakeup_w)
+    
+    def test_dio0_interrupt_delivers_expected_device(self, make_receiver, gpio):
+        """Test interrupts from another thread wake the listener, which skips other devices."""
+        receiver = make_receiver(dio0='D22')
+        radio = receiver.rfm9x
+        callback = gpio.callbacks[receiver._dio0_channel]
+        
+        def arrive(payload):
+            radio.packets.append((_packet(payload), True))
+            callback(receiver._dio0_channel)
+        
+        thread = _fire_later((0.05, lambda: arrive(b'ID:Device7, Temp:1.0')),
+                             (0.05, lambda: arrive(b'ID:Device5, Temp:25.5')))
+        start = time.monotonic()
+        message = receiver.listen_for_device('Device5', timeout=5)
+        thread.join()
+        
+        assert message == 'ID:Device5, Temp:25.5'
+        assert time.monotonic() - start < 2
+        assert radio.packets == []
+        assert receiver._rx_notify is None
+    
+    def test_dio0_packet_before_hookup_is_read(self, make_receiver, gpio):
+        """Test a packet completed before listening started is read without an interrupt."""
+        receiver = make_receiver(dio0='D22')
+        receiver.rfm9x.packets.append((_packet(b'ID:Device5, Temp:25.5'), True))
+        
+        assert receiver.listen_for_device('Device5', timeout=1) == 'ID:Device5, Temp:25.5'
+    
+    def test_dio0_wakeup_fd_ends_wait(self, make_receiver, gpio):
+        """Test the wakeup descriptor ends an interrupt wait early."""
+        receiver = make_receiver(dio0='D22')
+        wakeup_r, wakeup_w = os.pipe()
+        receiver.set_wakeup_fd(wakeup_r)
+        
+        try:
+            thread = _fire_later((0.05, lambda: os.write(wakeup_w, b'\0')))
+            start = time.monotonic()
+            assert receiver.listen_for_device('Device5', timeout=5) is None
+            thread.join()
+            assert time.monotonic() - start < 2
+        finally:
+            os.close(wakeup_r)
+            os.close(wakeup_w)
+    
+    def test_dio0_callback_after_loop_closed(self, make_receiver, gpio):
+        """Test an interrupt racing the listener's exit does not raise on the GPIO thread."""
+        receiver = make_receiver(dio0='D22')
+        loop = asyncio.new_event_loop()
+        loop.close()
+        receiver._rx_notify = lambda: loop.call_soon_threadsafe(lambda: None)
+        
+        receiver._on_dio0(receiver._dio0_channel)
+    
+    @pytest.mark.parametrize("pin, gpio_kwargs", [
+        ('D99', {}),
+        ('D22', {'setup_error': ValueError("The channel sent is invalid")}),
+        ('D22', {'detect_error': RuntimeError("Failed to add edge detection")}),
+    ])
+    def test_dio0_setup_failure_falls_back_to_polling(self, make_receiver, radio_modules, monkeypatch,
+                                                      pin, gpio_kwargs):
+        """Test DIO0 setup problems fall back to polling instead of failing radio init."""
+        monkeypatch.setattr(radio_modules, 'GPIO', FakeGPIO(**gpio_kwargs))
+        receiver = make_receiver(dio0=pin)
+        receiver.rfm9x.packets.append((_packet(b'ID:Device5, Temp:25.5'), True))
+        
+        assert receiver._dio0_channel is None
+        assert receiver.listen_for_device('Device5', timeout=0.5) == 'ID:Device5, Temp:25.5'
@@ -0,0 +1,235 @@
+"""Tests for replay log."""
+
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+from src.config.config_manager import ConfigManager
+from src.database.influxdb_client import InfluxDBManager, InfluxDBRejectedError
+from src.database.replay_log import ReplayLog
+
+
+class TestReplayLog:
+    """Test cases for ReplayLog."""
+    
+    @pytest.fixture
+    def log_dir(self, tmp_path):
+        """Create a log base directory."""
+        return str(tmp_path)
+    
+    @pytest.fixture
+    def manager(self):
+        """Create an InfluxDBManager whose synchronous write API is a mock."""
+        config = Mock(spec=ConfigManager)
+        config.get_influxdb_config.return_value = {'bucket': 'LoRa_Atmosphere', 'org': 'org_name'}
+        config.get_device_config.return_value = {'id': 'Device5'}
+        config.get_retry_config.return_value = {}
+        
+        with patch.object(InfluxDBManager, '_initialize_client'):
+            manager = InfluxDBManager(config)
+        manager.client = Mock()
+        manager._replay_write_api = Mock()
+        return manager
+    
+    def _unacknowledged(self, log_dir, replay_log, count):
+        """Append records the batching writer failed to write."""
+        lines = [f'sensor_data a={i}.0 {i}' for i in range(count)]
+        for line in lines:
+            self._append(log_dir, replay_log, '2024-01-15', line)
+            replay_log.on_batch_error(line.encode())
+        return lines
+    
+    def _append(self, log_dir, replay_log, date, line):
+        """Append a record to a daily log and register it."""
+        day_dir = os.path.join(log_dir, date)
+        os.makedirs(day_dir, exist_ok=True)
+        with open(os.path.join(day_dir, 'log.txt'), 'a') as f:
+            start = f.tell()
+            f.write(line + '\n')
+            end = f.tell()
+        replay_log.record_written(line, date, start, end)
+    
+    def test_nothing_to_replay_without_offset(self, log_dir):
+        """Test a fresh log has nothing to replay."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        
+        assert not replay_log.replay_needed
+        assert list(replay_log.iter_unacknowledged()) == []
+    
+    def test_acknowledged_records_are_not_replayed(self, log_dir):
+        """Test the offset advances past acknowledged records only."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=1.0 1')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=2.0 2')
+        
+        replay_log.on_batch_success(b'sensor_data a=1.0 1')
+        
+        restarted = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        chunks = list(restarted.iter_unacknowledged())
+        
+        assert restarted.replay_needed
+        assert [lines for lines, _ in chunks] == [[b'sensor_data a=2.0 2']]
+    
+    def test_out_of_order_batches_do_not_skip_records(self, log_dir):
+        """Test a later batch cannot advance the offset past an earlier one."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=1.0 1')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=2.0 2')
+        
+        replay_log.on_batch_success(b'sensor_data a=2.0 2')
+        
+        restarted = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        lines = [line for chunk, _ in restarted.iter_unacknowledged() for line in chunk]
+        
+        assert lines == [b'sensor_data a=1.0 1', b'sensor_data a=2.0 2']
+    
+    def test_failed_batch_is_replayed_across_days(self, log_dir):
+        """Test replay after a failed batch covers later daily logs."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=1.0 1')
+        self._append(log_dir, replay_log, '2024-01-16', 'sensor_data a=2.0 2')
+        
+        replay_log.on_batch_error(b'sensor_data a=1.0 1')
+        replay_log.on_batch_success(b'sensor_data a=2.0 2')
+        
+        assert replay_log.replay_needed
+        chunks = list(replay_log.iter_unacknowledged())
+        assert [lines for lines, _ in chunks] == [[b'sensor_data a=1.0 1'], [b'sensor_data a=2.0 2']]
+        
+        for _, position in chunks:
+            replay_log.acknowledge(position)
+        replay_log.finish_replay()
+        
+        assert not replay_log.replay_needed
+        assert list(replay_log.iter_unacknowledged()) == []
+    
+    def test_replay_is_chunked(self, log_dir):
+        """Test unacknowledged records are yielded in bounded chunks."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        for i in range(5):
+            self._append(log_dir, replay_log, '2024-01-15', f'sensor_data a={i}.0 {i}')
+        
+        chunks = [lines for lines, _ in replay_log.iter_unacknowledged(chunk_size=2)]
+        
+        assert [len(lines) for lines in chunks] == [2, 2, 1]
+    
+    def test_partial_record_is_not_replayed(self, log_dir):
+        """Test a record without its trailing newline is left for later."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=1.0 1')
+        with open(os.path.join(log_dir, '2024-01-15', 'log.txt'), 'a') as f:
+            f.write('sensor_data a=2.0')
+        
+        chunks = list(replay_log.iter_unacknowledged())
+        
+        assert [lines for lines, _ in chunks] == [[b'sensor_data a=1.0 1']]
+    
+    def test_rejected_record_is_quarantined_and_replay_continues(self, log_dir):
+        """Test a record InfluxDB rejects is quarantined instead of blocking replay."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        poison = 'sensor_data Status="OK" 1'
+        self._append(log_dir, replay_log, '2024-01-15', poison)
+        for i in range(2, 12):
+            self._append(log_dir, replay_log, '2024-01-15', f'sensor_data a={i}.0 {i}')
+        
+        replay_log.on_batch_error(poison.encode())
+        for i in range(2, 12):
+            replay_log.on_batch_success(f'sensor_data a={i}.0 {i}'.encode())
+        
+        written = []
+        
+        def write_lines(lines):
+            if poison.encode() in lines:
+                raise InfluxDBRejectedError("field type conflict")
+            written.extend(lines)
+            return True
+        
+        assert replay_log.replay(write_lines, chunk_size=4) == 11
+        assert not replay_log.replay_needed
+        assert len(written) == 10
+        assert list(replay_log.iter_unacknowledged()) == []
+        
+        with open(os.path.join(log_dir, 'influxdb.rejected'), 'rb') as f:
+            assert f.read() == poison.encode() + b'\n'
+        
+        # Later batches advance the offset again
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=12.0 12')
+        replay_log.on_batch_success(b'sensor_data a=12.0 12')
+        restarted = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        assert list(restarted.iter_unacknowledged()) == []
+    
+    def test_unauthorized_write_keeps_records_for_retry(self, log_dir, manager, caplog):
+        """Test a 401 stops replay after one request instead of quarantining every record."""
+        from influxdb_client.rest import ApiException
+        
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._unacknowledged(log_dir, replay_log, 10)
+        manager._replay_write_api.write.side_effect = ApiException(status=401, reason='Unauthorized')
+        
+        assert replay_log.replay(manager.write_lines, chunk_size=4) is None
+        
+        assert manager._replay_write_api.write.call_count == 1
+        assert not os.path.exists(os.path.join(log_dir, 'influxdb.rejected'))
+        assert replay_log.replay_needed
+        assert sum(len(lines) for lines, _ in replay_log.iter_unacknowledged()) == 10
+        assert any(r.levelname == 'ERROR' and 'HTTP 401' in r.getMessage() for r in caplog.records)
+    
+    def test_bad_request_quarantines_only_the_invalid_record(self, log_dir, manager):
+        """Test a 400 through write_lines quarantines the offending record alone."""
+        from influxdb_client.rest import ApiException
+        
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        lines = self._unacknowledged(log_dir, replay_log, 8)
+        poison = lines[5].encode()
+        
+        def write(record, **kwargs):
+            if poison in record:
+                raise ApiException(status=400, reason='Bad Request')
+        manager._replay_write_api.write.side_effect = write
+        
+        assert replay_log.replay(manager.write_lines, chunk_size=4) == 8
+        
+        assert list(replay_log.iter_unacknowledged()) == []
+        with open(os.path.join(log_dir, 'influxdb.rejected'), 'rb') as f:
+            assert f.read() == poison + b'\n'
+    
+    def test_too_large_request_is_split_without_quarantine(self, log_dir, manager):
+        """Test a 413 splits the chunk and writes every record."""
+        from influxdb_client.rest import ApiException
+        
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._unacknowledged(log_dir, replay_log, 4)
+        written = []
+        
+        def write(record, **kwargs):
+            if len(record) > 2:
+                raise ApiException(status=413, reason='Request Entity Too Large')
+            written.extend(record)
+        manager._replay_write_api.write.side_effect = write
+        
+        assert replay_log.replay(manager.write_lines, chunk_size=4) == 4
+        
+        assert len(written) == 4
+        assert not os.path.exists(os.path.join(log_dir, 'influxdb.rejected'))
+    
+    def test_transient_failure_stops_replay(self, log_dir):
+        """Test a retryable write failure leaves records for the next replay."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset')
+        self._append(log_dir, replay_log, '2024-01-15', 'sensor_data a=1.0 1')
+        replay_log.on_batch_error(b'sensor_data a=1.0 1')
+        
+        assert replay_log.replay(lambda lines: False) is None
+        assert replay_log.replay_needed
+        assert not os.path.exists(os.path.join(log_dir, 'influxdb.rejected'))
+    
+    def test_pending_records_are_bounded(self, log_dir):
+        """Test tracked records are capped, falling back to a disk replay."""
+        replay_log = ReplayLog(log_dir, 'log.txt', 'influxdb.offset', max_pending=3)
+        for i in range(5):
+            self._append(log_dir, replay_log, '2024-01-15', f'sensor_data a={i}.0 {i}')
+        
+        assert len(replay_log._pending) == 3
+        assert replay_log.replay_needed
+        
+        lines = [line for chunk, _ in replay_log.iter_unacknowledged() for line in chunk]
+        assert len(lines) == 5